@@ -1,12 +1,28 @@
 
 import streamlit as st
 import asyncio
+import atexit
 import random
+import threading
+import time
 import json
+import html
+import queue
 import os
 from pathlib import Path
+from collections import OrderedDict
 from simple_rag_system import SimpleRAGSystem
-import base64
+import numpy as np
+
+# libuv-backed event loop with cheaper callback scheduling (not available on Windows)
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
+# Assets are resolved from the app's directory, not the working directory Streamlit was launched from
+current_dir = Path(__file__).parent
 
 # 🎨 EASY CUSTOMIZATION OPTIONS - Edit these values to personalize your app
 APP_TITLE = "CosmoRAG"
@@ -15,12 +31,32 @@ APP_ICON = "🌌"
 
 # Background options
 BACKGROUND_IMAGE = "fixed_nasa"  # Use fixed NASA background image
+ENABLE_EFFECTS = False  # Ship the animated star/nebula layer styles (static/css/effects.css)
 
 # Theme colors (hex codes)
-PRIMARY_COLOR = "#4a90e2"      # Main blue color
-ACCENT_COLOR = "#9b59b6"       # Purple accent
 TEXT_COLOR = "#ffffff"         # White text
-BACKGROUND_OVERLAY = "rgba(0, 0, 0, 0.2)"  # Light overlay for readability
+
+# Static markup, built once at import rather than on every rerun
+COSMIC_TITLE_HTML = f'''
+<div class="cosmic-title-container">
+    <h1 class="cosmic-title">
+        <span class="title-text">{APP_TITLE}</span>
+    </h1>
+    <p class="cosmic-subtitle">{APP_SUBTITLE}</p>
+</div>
+'''
+
+# Overlays that darken the background for text readability
+SIMPLE_BACKGROUND_HTML = """
+<div class="cosmic-overlay"></div>
+<div class="text-readability-overlay"></div>
+"""
+
+# Opening tag for the main UI container, keyed by whether results are showing
+MAIN_CONTAINER_OPEN_HTML = {
+    False: '<div class="main-ui-container">',
+    True: '<div class="main-ui-container with-results">',
+}
 
 # --- Page Configuration ---
 st.set_page_config(
@@ -29,1051 +65,281 @@ st.set_page_config(
     layout="centered",
 )
 
-# --- Asset Loading ---
-def get_local_image_files(folder_path):
-    """Get a list of image files from a local folder."""
-    supported_formats = ['.png', '.jpg', '.jpeg', '.gif', '.webp']
-    return [f for f in os.listdir(folder_path) if any(f.lower().endswith(ext) for ext in supported_formats)]
-
-def get_image_as_base64(path):
-    """Get image as base64 string."""
-    with open(path, "rb") as f:
-        data = f.read()
-    return base64.b64encode(data).decode()
-
-# --- Background Slideshow Logic ---
-def get_background_slideshow_html(image_files, image_titles):
-    """Generate HTML for a dynamic background slideshow."""
-    slides_html = ""
-    for i, (img_file, title) in enumerate(zip(image_files, image_titles)):
-        img_path = os.path.join("static/backgrounds", img_file)
-        base64_img = get_image_as_base64(img_path)
-        active_class = "active" if i == 0 else ""
-        slides_html += f"""
-        <div class="bg-slide {active_class}" 
-             style="background-image: url('data:image/jpeg;base64,{base64_img}');"
-             data-title="{title}">
-        </div>
-        """
-    return f'<div class="background-slideshow">{slides_html}</div>'
-
 # --- Custom CSS for Styling ---
-st.markdown(
-    f"""
-    <style>
-    /* Background Slideshow */
-    .background-slideshow {{
-        position: fixed;
-        top: 0;
-        left: 0;
-        width: 100vw;
-        height: 100vh;
-        z-index: -10;
-        overflow: hidden;
-    }}
-    .bg-slide {{
-        position: absolute;
-        top: 0;
-        left: 0;
-        width: 100%;
-        height: 100%;
-        background-size: cover;
-        background-position: center;
-        background-repeat: no-repeat;
-        opacity: 0;
-        transition: opacity 2s ease-in-out;
-        z-index: 1;
-    }}
-    .bg-slide.active {{
-        opacity: 1;
-        z-index: 2;
-    }}
-    
-    /* Image Title Overlay */
-    .image-title-overlay {{
-        position: fixed;
-        bottom: 20px;
-        left: 20px;
-        background: rgba(0, 0, 0, 0.3);
-        color: white;
-        padding: 8px 16px;
-        border-radius: 12px;
-        z-index: 100;
-        font-size: 14px;
-        backdrop-filter: blur(5px);
-        border: 1px solid rgba(255, 255, 255, 0.2);
-        opacity: 0;
-        transition: opacity 1s ease-in-out;
-    }}
-    
-    /* Enhanced cosmic overlay for better text readability */
-    .cosmic-overlay {{
-        position: fixed;
-        top: 0;
-        left: 0;
-        width: 100vw;
-        height: 100vh;
-        z-index: -9;
-        background: radial-gradient(ellipse at center, 
-            rgba(25, 25, 112, 0.1) 0%, 
-            rgba(0, 0, 0, 0.2) 30%, 
-            rgba(0, 0, 0, 0.3) 60%, 
-            rgba(0, 0, 0, 0.4) 100%);
-        pointer-events: none;
-    }}
-    
-    /* Additional text readability overlay specifically for content areas */
-    .text-readability-overlay {{
-        position: fixed;
-        top: 0;
-        left: 0;
-        width: 100vw;
-        height: 100vh;
-        z-index: -8;
-        background: linear-gradient(
-            135deg,
-            rgba(0, 0, 0, 0.1) 0%,
-            rgba(0, 0, 0, 0.3) 25%,
-            rgba(0, 0, 0, 0.2) 50%,
-            rgba(0, 0, 0, 0.3) 75%,
-            rgba(0, 0, 0, 0.1) 100%
-        );
-        pointer-events: none;
-    }}
-    
-    /* Streamlit app container - moved to main UI section above */
-    
-    /* Enhanced multi-layer star system with parallax */
-    .star, .planet, .moon, .streaming-star, .nebula, .shooting-star, .particle {{
-        position: absolute;
-        pointer-events: none;
-    }}
-    
-    /* Star Layer 1: Background twinkling stars (slowest) */
-    .star-layer-1 {{
-        background-color: rgba(255, 255, 255, 0.6);
-        border-radius: 50%;
-        animation: twinkle-slow 15s linear infinite, float-horizontal-slow 50s linear infinite;
-        z-index: -7;
-    }}
-    
-    /* Star Layer 2: Medium stars with color variation */
-    .star-layer-2 {{
-        border-radius: 50%;
-        animation: twinkle-medium 10s linear infinite, float-horizontal-medium 40s linear infinite;
-        z-index: -6;
-    }}
-    
-    /* Star Layer 3: Foreground bright stars (fastest) */
-    .star-layer-3 {{
-        background-color: rgba(255, 255, 255, 0.9);
-        border-radius: 50%;
-        animation: twinkle-fast 5s linear infinite, float-horizontal-fast 30s linear infinite;
-        z-index: -5;
-        box-shadow: 0 0 6px rgba(255, 255, 255, 0.8);
-    }}
-    
-    /* Shooting stars */
-    .shooting-star {{
-        background: linear-gradient(45deg, 
-            rgba(255, 255, 255, 0) 0%, 
-            rgba(255, 255, 255, 1) 50%, 
-            rgba(135, 206, 250, 0.8) 80%,
-            rgba(255, 255, 255, 0) 100%);
-        border-radius: 50%;
-        z-index: -4;
-        animation: shooting-star 15s linear infinite;
-        box-shadow: 0 0 10px rgba(135, 206, 250, 0.6);
-    }}
-    
-    /* Streaming particles for atmosphere */
-    .particle {{
-        background: radial-gradient(circle, 
-            rgba(255, 255, 255, 0.8) 0%, 
-            rgba(255, 255, 255, 0.4) 50%, 
-            transparent 100%);
-        border-radius: 50%;
-        z-index: -4;
-        animation: particle-drift 20s linear infinite;
-    }}
-    
-    /* Legacy streaming stars for compatibility */
-    .streaming-star {{
-        background: linear-gradient(90deg, 
-            rgba(255, 255, 255, 0) 0%, 
-            rgba(255, 255, 255, 0.8) 50%, 
-            rgba(255, 255, 255, 0) 100%);
-        z-index: -4;
-        animation: stream 10s linear infinite;
-    }}
-    
-    /* Nebula clouds */
-    .nebula {{
-        border-radius: 50%;
-        z-index: -6;
-        animation: nebula-drift 30s linear infinite;
-        filter: blur(2px);
-    }}
-    
-    .nebula-1 {{
-        background: radial-gradient(circle, 
-            rgba(138, 43, 226, 0.2) 0%, 
-            rgba(75, 0, 130, 0.1) 50%, 
-            transparent 100%);
-    }}
-    
-    .nebula-2 {{
-        background: radial-gradient(circle, 
-            rgba(220, 20, 60, 0.2) 0%, 
-            rgba(139, 69, 19, 0.1) 50%, 
-            transparent 100%);
-    }}
-    
-    .nebula-3 {{
-        background: radial-gradient(circle, 
-            rgba(0, 191, 255, 0.2) 0%, 
-            rgba(30, 144, 255, 0.1) 50%, 
-            transparent 100%);
-    }}
-    
-    /* Black hole effect */
-    .black-hole {{
-        position: fixed;
-        width: 150px;
-        height: 150px;
-        border-radius: 50%;
-        background: radial-gradient(circle, 
-            rgba(0, 0, 0, 1) 30%, 
-            rgba(139, 69, 19, 0.8) 50%, 
-            rgba(255, 140, 0, 0.4) 70%,
-            transparent 100%);
-        animation: black-hole-pulse 8s ease-in-out infinite, 
-                   black-hole-rotate 20s linear infinite;
-        z-index: -3;
-        filter: blur(1px);
-    }}
-    
-    /* Enhanced planet animations */
-    .planet, .moon {{
-        border-radius: 50%;
-        background-size: cover;
-        background-position: center;
-        animation: orbit 120s linear infinite;
-        z-index: -5;
-        filter: drop-shadow(0 0 20px rgba(255, 255, 255, 0.3));
-    }}
-    
-    .planet1 {{ background-image: url('https://i.imgur.com/CjB1g00.png'); }}
-    .planet2 {{ background-image: url('https://i.imgur.com/F2g2000.png'); }}
-    .moon1 {{ background-image: url('https://i.imgur.com/DkL1g00.png'); }}
-
-    /* Enhanced Animation keyframes */
-    /* Multi-layer twinkling animations */
-    @keyframes twinkle-slow {{
-        0% {{ opacity: 0.2; transform: scale(0.8); }}
-        50% {{ opacity: 0.8; transform: scale(1.1); }}
-        100% {{ opacity: 0.2; transform: scale(0.8); }}
-    }}
-    
-    @keyframes twinkle-medium {{
-        0% {{ opacity: 0.4; transform: scale(0.9); }}
-        50% {{ opacity: 1; transform: scale(1.3); }}
-        100% {{ opacity: 0.4; transform: scale(0.9); }}
-    }}
-    
-    @keyframes twinkle-fast {{
-        0% {{ opacity: 0.6; transform: scale(1); }}
-        50% {{ opacity: 1; transform: scale(1.4); }}
-        100% {{ opacity: 0.6; transform: scale(1); }}
-    }}
-    
-    /* Horizontal floating animations for parallax effect */
-    @keyframes float-horizontal-slow {{
-        0% {{ transform: translateX(-10px); }}
-        50% {{ transform: translateX(10px); }}
-        100% {{ transform: translateX(-10px); }}
-    }}
-    
-    @keyframes float-horizontal-medium {{
-        0% {{ transform: translateX(-15px); }}
-        50% {{ transform: translateX(15px); }}
-        100% {{ transform: translateX(-15px); }}
-    }}
-    
-    @keyframes float-horizontal-fast {{
-        0% {{ transform: translateX(-20px); }}
-        50% {{ transform: translateX(20px); }}
-        100% {{ transform: translateX(-20px); }}
-    }}
-    
-    /* Shooting star animation */
-    @keyframes shooting-star {{
-        0% {{ 
-            transform: translateX(-200px) translateY(-100px) rotate(45deg);
-            opacity: 0;
-        }}
-        10% {{ opacity: 1; }}
-        90% {{ opacity: 1; }}
-        100% {{ 
-            transform: translateX(100vw) translateY(100vh) rotate(45deg);
-            opacity: 0;
-        }}
-    }}
-    
-    /* Particle drift animation */
-    @keyframes particle-drift {{
-        0% {{ 
-            transform: translateX(-50px) translateY(100vh);
-            opacity: 0;
-        }}
-        10% {{ opacity: 0.6; }}
-        90% {{ opacity: 0.6; }}
-        100% {{ 
-            transform: translateX(50px) translateY(-100px);
-            opacity: 0;
-        }}
-    }}
-    
-    /* Legacy animations for compatibility */
-    @keyframes twinkle {{
-        0% {{ opacity: 0.3; transform: scale(0.8); }}
-        50% {{ opacity: 1; transform: scale(1.2); }}
-        100% {{ opacity: 0.3; transform: scale(0.8); }}
-    }}
-    
-    @keyframes stream {{
-        0% {{ 
-            transform: translateX(-100vw) translateY(0px);
-            opacity: 0;
-        }}
-        10% {{ opacity: 1; }}
-        90% {{ opacity: 1; }}
-        100% {{ 
-            transform: translateX(100vw) translateY(-50px);
-            opacity: 0;
-        }}
-    }}
-    
-    @keyframes nebula-drift {{
-        0% {{ transform: translateX(-50px) translateY(0px) rotate(0deg); }}
-        100% {{ transform: translateX(50px) translateY(-20px) rotate(360deg); }}
-    }}
-    
-    @keyframes orbit {{
-        from {{ transform: rotate(0deg) translateX(100px) rotate(0deg); }}
-        to {{ transform: rotate(360deg) translateX(100px) rotate(-360deg); }}
-    }}
-    
-    @keyframes black-hole-pulse {{
-        0% {{ filter: blur(1px) brightness(1); }}
-        50% {{ filter: blur(2px) brightness(1.2); }}
-        100% {{ filter: blur(1px) brightness(1); }}
-    }}
-    
-    @keyframes black-hole-rotate {{
-        from {{ transform: rotate(0deg); }}
-        to {{ transform: rotate(360deg); }}
-    }}
-    
-    /* Streamlit App Root Overrides */
-    .stApp {{
-        background: transparent !important;
-        z-index: 1 !important;
-    }}
-    
-    /* Main Streamlit Container Overrides */
-    .main .block-container {{
-        padding-top: 0 !important;
-        padding-bottom: 0 !important;
-        max-width: none !important;
-    }}
-    
-    /* Invisible UI Container - No Visual Elements */
-    .main-ui-container {{
-        position: relative;
-        margin: 20px auto;
-        width: 90%;
-        max-width: 800px;
-        /* All visual elements removed - completely transparent */
-        background: transparent;
-        padding: 40px;
-        min-height: auto;
-        overflow: visible;
-        z-index: 1000;
-    }}
-
-    /* Results layout - maintain normal flow */
-    .main-ui-container.with-results {{
-        width: 95%;
-        max-width: 1000px;
-        margin-top: 20px;
-    }}
-
-    /* Results container for scrollable content */
-    .results-container {{
-        position: relative;
-        z-index: 999;
-        margin-top: 20px;
-        background: rgba(0, 0, 0, 0.3);
-        backdrop-filter: blur(15px);
-        border-radius: 20px;
-        padding: 30px;
-        border: 1px solid rgba(255, 255, 255, 0.2);
-    }}
-
-    /* UI Elements styling */
-    .stTextInput > div > div > input {{
-        background-color: rgba(255, 255, 255, 0.1);
-        color: white;
-        backdrop-filter: blur(10px);
-        border: 1px solid rgba(255, 255, 255, 0.2);
-        border-radius: 12px;
-        font-size: 16px;
-        padding: 12px 16px;
-    }}
-    
-    .stButton > button {{
-        background: transparent;
-        color: {TEXT_COLOR};
-        border-radius: 15px;
-        border: 2px solid rgba(255, 255, 255, 0.2);
-        padding: 14px 28px;
-        font-weight: 500;
-        backdrop-filter: blur(15px);
-        transition: all 0.3s ease;
-        font-size: 16px;
-        width: 100%;
-        text-shadow: 0 2px 4px rgba(0, 0, 0, 0.3);
-        letter-spacing: 0.5px;
-    }}
-    
-    .stButton > button:hover {{
-        background: rgba(255, 255, 255, 0.1);
-        border: 2px solid rgba(255, 255, 255, 0.4);
-        transform: translateY(-3px);
-        box-shadow: 0 8px 25px rgba(255, 255, 255, 0.15);
-        text-shadow: 0 0 10px rgba(255, 255, 255, 0.5);
-    }}
-    
-    .response-card {{
-        background-color: rgba(0, 0, 0, 0.15);
-        border-radius: 20px;
-        padding: 30px;
-        margin-bottom: 20px;
-        border: 1px solid rgba(255, 255, 255, 0.1);
-        backdrop-filter: blur(20px);
-        box-shadow: 0 8px 32px rgba(0, 0, 0, 0.2);
-        min-height: 200px;
-        font-size: 16px;
-        line-height: 1.6;
-        max-height: 600px;
-        overflow-y: auto;
-    }}
-    
-    .source-card {{
-        background-color: rgba(0, 0, 0, 0.15);
-        border-radius: 18px;
-        padding: 25px;
-        margin-bottom: 15px;
-        border: 1px solid rgba(255, 255, 255, 0.1);
-        backdrop-filter: blur(20px);
-        box-shadow: 0 8px 32px rgba(0, 0, 0, 0.2);
-    }}
-    
-    /* 🌌 Seamless Cosmic Text - Zero Containers, Pure Background Integration 🌌 */
-    .cosmic-title-container {{
-        /* Completely invisible container - no visual elements */
-        text-align: center;
-        margin-bottom: 50px;
-        position: relative;
-        z-index: 1000;
-        /* ZERO styling - completely transparent */
-        background: transparent;
-        border: none;
-        box-shadow: none;
-        padding: 20px 0;
-    }}
-    
-    .cosmic-title {{
-        font-family: 'Inter', 'Segoe UI', 'SF Pro Display', -apple-system, sans-serif;
-        font-size: 4.5rem;
-        font-weight: 300;  /* Much lighter weight for ethereal feel */
-        margin: 0;
-        padding: 0;
-        display: flex;
-        align-items: center;
-        justify-content: center;
-        position: relative;
-        letter-spacing: 5px;
-        
-        /* Subtle semi-transparent blend with background */
-        color: rgba(255, 255, 255, 0.85);
-        
-        /* Soft natural glow using text-shadow only */
-        text-shadow: 0 0 20px rgba(255, 255, 255, 0.3),
-                     0 0 40px rgba(135, 206, 250, 0.2),
-                     0 0 60px rgba(255, 255, 255, 0.1),
-                     0 2px 4px rgba(0, 0, 0, 0.1);
-        
-        /* Gentle floating animation */
-        animation: textFloat 8s ease-in-out infinite;
-    }}
-    
-    .title-text {{
-        position: relative;
-        display: inline-block;
-    }}
-    
-    .cosmic-subtitle {{
-        font-family: 'Inter', 'Segoe UI', sans-serif;
-        font-size: 1.4rem;
-        font-weight: 200;  /* Ultra-light weight */
-        margin: 15px 0 0 0;
-        letter-spacing: 3px;
-        text-transform: uppercase;
-        
-        /* Semi-transparent white with subtle blue tint */
-        color: rgba(255, 255, 255, 0.75);
-        
-        /* Soft text-shadow glow */
-        text-shadow: 0 0 15px rgba(255, 255, 255, 0.2),
-                     0 0 30px rgba(135, 206, 250, 0.15),
-                     0 1px 3px rgba(0, 0, 0, 0.1);
-        
-        /* Gentle breathing animation */
-        animation: subtitleBreathe 10s ease-in-out infinite;
-        position: relative;
-    }}
-    
-    /* Minimal, soft animations */
-    @keyframes textFloat {{
-        0%, 100% {{ 
-            transform: translateY(0px);
-            text-shadow: 0 0 20px rgba(255, 255, 255, 0.3),
-                         0 0 40px rgba(135, 206, 250, 0.2),
-                         0 0 60px rgba(255, 255, 255, 0.1),
-                         0 2px 4px rgba(0, 0, 0, 0.1);
-        }}
-        50% {{ 
-            transform: translateY(-2px);
-            text-shadow: 0 0 25px rgba(255, 255, 255, 0.4),
-                         0 0 45px rgba(135, 206, 250, 0.25),
-                         0 0 65px rgba(255, 255, 255, 0.15),
-                         0 2px 4px rgba(0, 0, 0, 0.1);
-        }}
-    }}
-    
-    @keyframes subtitleBreathe {{
-        0%, 100% {{ 
-            opacity: 0.75;
-            text-shadow: 0 0 15px rgba(255, 255, 255, 0.2),
-                         0 0 30px rgba(135, 206, 250, 0.15),
-                         0 1px 3px rgba(0, 0, 0, 0.1);
-        }}
-        50% {{ 
-            opacity: 0.9;
-            text-shadow: 0 0 20px rgba(255, 255, 255, 0.3),
-                         0 0 35px rgba(135, 206, 250, 0.2),
-                         0 1px 3px rgba(0, 0, 0, 0.1);
-        }}
-    }}
-    
-    
-    /* Responsive seamless title design */
-    @media (max-width: 768px) {{
-        .cosmic-title-container {{
-            margin-bottom: 40px;
-            padding: 15px 0;
-        }}
-        .cosmic-title {{
-            font-size: 3.5rem;
-            letter-spacing: 4px;
-            font-weight: 300;
-        }}
-        .cosmic-subtitle {{
-            font-size: 1.2rem;
-            letter-spacing: 2px;
-            font-weight: 200;
-            margin: 12px 0 0 0;
-        }}
-    }}
-    
-    @media (max-width: 480px) {{
-        .cosmic-title-container {{
-            margin-bottom: 30px;
-            padding: 10px 0;
-        }}
-        .cosmic-title {{
-            font-size: 2.8rem;
-            letter-spacing: 3px;
-            font-weight: 300;
-        }}
-        .cosmic-subtitle {{
-            font-size: 1.0rem;
-            letter-spacing: 2px;
-            font-weight: 200;
-            margin: 10px 0 0 0;
-        }}
-        /* Lighter animations on mobile for performance */
-        .cosmic-title {{
-            animation: textFloat 12s ease-in-out infinite;
-        }}
-        .cosmic-subtitle {{
-            animation: subtitleBreathe 15s ease-in-out infinite;
-        }}
-    }}
-
-    h1, h2, h3, h4, h5, h6, p, li, .stMarkdown {{
-        color: white;
-        text-shadow: 0 2px 4px rgba(0, 0, 0, 0.5);
-    }}
-    
-    /* Enhanced response card text styling */
-    .response-card p {{
-        margin-bottom: 12px;
-        font-size: 16px;
-        line-height: 1.7;
-    }}
-    
-    .response-card h1, .response-card h2, .response-card h3 {{
-        margin-top: 20px;
-        margin-bottom: 15px;
-        color: #4a90e2;
-    }}
-    
-    .response-card ul, .response-card ol {{
-        margin-left: 20px;
-        margin-bottom: 15px;
-    }}
-    
-    .response-card li {{
-        margin-bottom: 8px;
-        line-height: 1.6;
-    }}
-    
-    /* Deep dive section styling */
-    .stTextInput[data-testid="deep_dive_input"] input {{
-        background-color: rgba(74, 144, 226, 0.1) !important;
-        border: 2px solid rgba(74, 144, 226, 0.3) !important;
-        color: white !important;
-        font-size: 16px !important;
-    }}
-    
-    .stTextInput[data-testid="deep_dive_input"] input:focus {{
-        border-color: rgba(74, 144, 226, 0.6) !important;
-        box-shadow: 0 0 10px rgba(74, 144, 226, 0.3) !important;
-    }}
-    
-    /* Style Streamlit info components to match cosmic theme */
-    .stInfo {{
-        background-color: rgba(0, 100, 200, 0.2) !important;
-        border: 1px solid rgba(0, 150, 255, 0.3) !important;
-        border-radius: 12px !important;
-        backdrop-filter: blur(10px) !important;
-        color: white !important;
-    }}
-    
-    .stInfo > div {{
-        color: white !important;
-    }}
-    
-    /* Remove any potential black boxes from Streamlit components */
-    .stAlert, .stInfo, .stSuccess, .stWarning, .stError {{
-        background-color: rgba(0, 0, 0, 0.3) !important;
-        backdrop-filter: blur(15px) !important;
-        border-radius: 12px !important;
-        border: 1px solid rgba(255, 255, 255, 0.2) !important;
-        color: white !important;
-    }}
-    
-    /* Enhanced Performance optimizations with hardware acceleration */
-    .background-slideshow {{
-        will-change: opacity;
-        transform: translateZ(0);
-        backface-visibility: hidden;
-        perspective: 1000px;
-    }}
-    
-    .bg-slide {{
-        will-change: opacity, transform;
-        transform: translateZ(0) translate3d(0, 0, 0);
-        backface-visibility: hidden;
-        image-rendering: optimizeSpeed;
-        image-rendering: -webkit-optimize-contrast;
-        image-rendering: optimize-contrast;
-    }}
-    
-    /* Hardware acceleration for all star layers */
-    .star-layer-1, .star-layer-2, .star-layer-3, .star {{
-        will-change: opacity, transform;
-        transform: translateZ(0) translate3d(0, 0, 0);
-        backface-visibility: hidden;
-        contain: layout style paint;
-    }}
-    
-    .shooting-star {{
-        will-change: transform, opacity;
-        transform: translateZ(0) translate3d(0, 0, 0);
-        backface-visibility: hidden;
-        contain: layout style paint;
-    }}
-    
-    .particle {{
-        will-change: transform, opacity;
-        transform: translateZ(0) translate3d(0, 0, 0);
-        backface-visibility: hidden;
-        contain: layout style paint;
-    }}
-    
-    .cosmic-title {{
-        will-change: filter, transform;
-        transform: translateZ(0) translate3d(0, 0, 0);
-        backface-visibility: hidden;
-    }}
-    
-    .cosmic-title::before {{
-        will-change: background-position, opacity;
-        transform: translateZ(0);
-        backface-visibility: hidden;
-    }}
-    
-    .black-hole {{
-        will-change: transform, filter;
-        transform: translateZ(0) translate3d(0, 0, 0);
-        backface-visibility: hidden;
-        contain: layout style paint;
-    }}
-    
-    .nebula {{
-        will-change: transform, opacity;
-        transform: translateZ(0) translate3d(0, 0, 0);
-        backface-visibility: hidden;
-        contain: layout style paint;
-    }}
-    
-    /* Memory optimization - reduce complexity on lower-end devices */
-    @media (max-width: 768px) and (max-device-pixel-ratio: 2) {{
-        .cosmic-title::before {{
-            display: none; /* Remove glow effect on mobile */
-        }}
-        
-        .star-layer-1, .star-layer-2 {{
-            animation-duration: 20s, 60s !important; /* Slower animations */
-        }}
-        
-        .shooting-star {{
-            animation-duration: 20s !important;
-        }}
-    }}
-    
-    /* Ultra-low performance mode for older devices */
-    @media (max-width: 480px) and (max-device-pixel-ratio: 1) {{
-        .star-layer-1 {{
-            display: none; /* Hide background layer on very low-end devices */
-        }}
-        
-        .particle {{
-            display: none; /* Hide particles on very low-end devices */
-        }}
-        
-        .nebula {{
-            animation: none !important; /* Disable nebula animation */
-        }}
-        
-        .cosmic-title {{
-            animation-duration: 8s, 4s !important; /* Slower title animation */
-        }}
-    }}
-    
-    /* Enhanced reduced motion for accessibility */
-    @media (prefers-reduced-motion: reduce) {{
-        .bg-slide, .star, .black-hole, .star-layer-1, .star-layer-2, .star-layer-3,
-        .shooting-star, .particle, .nebula {{
-            animation: none !important;
-            transition: none !important;
-        }}
-        
-        .cosmic-title, .cosmic-title::before, .title-icon, .cosmic-subtitle {{
-            animation: none !important;
-            transition: none !important;
-        }}
-        
-        .image-title-overlay {{
-            opacity: 0.9 !important;
-        }}
-        
-        /* Maintain static visual interest without motion */
-        .cosmic-title {{
-            background: linear-gradient(45deg, #4a90e2 0%, #9b59b6 50%, #e74c3c 100%);
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-            background-clip: text;
-        }}
-    }}
-    
-    /* Additional Streamlit overrides for proper layout */
-    .element-container {{
-        z-index: inherit !important;
-    }}
-    
-    /* Ensure Streamlit sidebar doesn't interfere */
-    .css-1d391kg {{
-        z-index: 999 !important;
-    }}
-    
-    /* Streamlit header override */
-    header[data-testid="stHeader"] {{
-        background: transparent !important;
-        height: 0 !important;
-    }}
-    
-    /* Responsive design */
-    @media (max-width: 768px) {{
-        .background-slideshow {{
-            height: 100vh;
-        }}
-        
-        .bg-slide {{
-            background-attachment: scroll; /* Better mobile performance */
-        }}
-        
-        .black-hole {{
-            width: 80px;
-            height: 80px;
-        }}
-        
-        .image-title-overlay {{
-            bottom: 15px;
-            left: 15px;
-            font-size: 12px;
-            padding: 6px 12px;
-        }}
-        
-        .main-ui-container {{
-            width: 95%;
-            padding: 25px;
-            margin: 10px auto;
-        }}
-        .stButton > button {{
-            padding: 12px 24px;
-            font-size: 14px;
-            border-radius: 12px;
-        }}
-        .stTextInput > div > div > input {{
-            font-size: 14px;
-            padding: 10px 14px;
-        }}
-    }}
-    
-    @media (max-width: 480px) {{
-        .main-ui-container {{
-            width: 98%;
-            padding: 20px;
-            border-radius: 15px;
-            margin: 5px auto;
-        }}
-        
-        .stButton > button {{
-            padding: 10px 20px;
-            font-size: 13px;
-            border-radius: 10px;
-        }}
-        .stTextInput > div > div > input {{
-            font-size: 13px;
-            padding: 8px 12px;
-        }}
-    }}
-    </style>
-    """,
-    unsafe_allow_html=True
-)
+@st.cache_data(show_spinner=False)
+def load_css(path: str) -> str:
+    """Read a stylesheet (relative to the app directory) once per process instead of rebuilding it on every rerun"""
+    return (current_dir / path).read_text()
 
 # --- Fixed NASA Background ---
-if BACKGROUND_IMAGE == "fixed_nasa":
-    # Get the fixed NASA background image
-    nasa_bg_path = "static/backgrounds/main_nasa_bg.jpg"
-    if os.path.exists(nasa_bg_path):
-        base64_img = get_image_as_base64(nasa_bg_path)
-        st.markdown(
-            f'''
-            <div class="fixed-background" style="
-                position: fixed;
-                top: 0;
-                left: 0;
-                width: 100vw;
-                height: 100vh;
-                z-index: -10;
-                background-image: url('data:image/jpeg;base64,{base64_img}');
-                background-size: cover;
-                background-position: center;
-                background-repeat: no-repeat;
-            "></div>
-            <div class="image-title-overlay" style="opacity: 0.8;">Hubble Space Telescope Deep Field</div>
-            ''',
-            unsafe_allow_html=True
-        )
+def get_fixed_background_html() -> str:
+    """Markup for the fixed NASA background image, or an empty string when disabled or missing
+    
+    The image is served as a static WebP file (see .fixed-background in cosmic.css) instead of being
+    base64-inlined into the page, so the browser fetches and caches it once.
+    """
+    nasa_bg_path = current_dir / "static/backgrounds/main_nasa_bg_2000.webp"
+    if BACKGROUND_IMAGE != "fixed_nasa" or not nasa_bg_path.exists():
+        return ""
+    return '''
+<div class="fixed-background"></div>
+<div class="image-title-overlay" style="opacity: 0.8;">Hubble Space Telescope Deep Field</div>
+'''
 
-# Legacy function for video background (kept for compatibility)
-def get_base64_video(video_file):
-    with open(video_file, "rb") as f:
-        data = f.read()
-    return base64.b64encode(data).decode()
+def get_background_preload_html() -> str:
+    """High-priority preloads for the background variant the viewport will use, matching cosmic.css's breakpoint
+    
+    A CSS background is only requested once styles are matched against the div; these start the fetch as
+    soon as the markup is inserted, ahead of the stylesheet being applied.
+    """
+    if BACKGROUND_IMAGE != "fixed_nasa" or not (current_dir / "static/backgrounds/main_nasa_bg_2000.webp").exists():
+        return ""
+    return (
+        '<link rel="preload" as="image" type="image/webp" fetchpriority="high" '
+        'href="/app/static/backgrounds/main_nasa_bg_2000.webp" media="(min-width: 1281px)">\n'
+        '<link rel="preload" as="image" type="image/webp" fetchpriority="high" '
+        'href="/app/static/backgrounds/main_nasa_bg_1280.webp" media="(max-width: 1280px)">\n'
+    )
+
+@st.cache_data(show_spinner=False)
+def get_static_page_html() -> str:
+    """Stylesheet, background and overlays assembled once per process
+    
+    Inlined rather than <link>ed: Streamlit's static server sends .css as text/plain, which browsers refuse.
+    """
+    effects_css = load_css('static/css/effects.css') if ENABLE_EFFECTS else ""
+    # Conditional overrides sit in their own media-scoped <style> blocks so browsers skip them when they don't apply
+    return (
+        f"{get_background_preload_html()}"
+        f"<style>:root {{ --text-color: {TEXT_COLOR}; }}\n{load_css('static/css/cosmic.css')}\n{effects_css}</style>\n"
+        f"<style media=\"(max-width: 768px)\">{load_css('static/css/cosmic-mobile.css')}</style>\n"
+        f"<style media=\"(prefers-reduced-motion: reduce)\">{load_css('static/css/cosmic-reduced-motion.css')}</style>\n"
+        f"{get_fixed_background_html()}\n{SIMPLE_BACKGROUND_HTML}"
+    )
+
+# Emitted on every rerun on purpose: Streamlit drops any element a rerun doesn't re-emit, so gating this
+# behind a session-state flag would strip the styling after the first interaction. The markup itself is
+# cached, so a rerun only re-sends an identical element, which the frontend leaves untouched.
+st.markdown(get_static_page_html(), unsafe_allow_html=True)
+
+# --- Shared Event Loop ---
+@st.cache_resource
+def get_event_loop():
+    """Long-lived event loop on a background thread, shared by every rerun and session
+    
+    Pooled HTTP connections and other loop-bound state survive across queries, and
+    concurrent sessions' searches interleave on it instead of queueing behind a lock.
+    """
+    loop = uvloop.new_event_loop() if UVLOOP_AVAILABLE else asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="rag-event-loop", daemon=True).start()
+    return loop
+
+def iterate_async(async_iterator, idle_timeout=None):
+    """Consume an async iterator on the shared loop, yielding its items in the calling (script) thread
+    
+    With idle_timeout set, a TimeoutError is raised if the iterator goes that many seconds without
+    producing an item, so a stalled search can't pin the script thread forever.
+    """
+    items = queue.Queue()
+    finished = object()
+    
+    async def pump():
+        try:
+            async for item in async_iterator:
+                items.put(item)
+        finally:
+            items.put(finished)
+    
+    future = asyncio.run_coroutine_threadsafe(pump(), get_event_loop())
+    try:
+        while True:
+            try:
+                item = items.get(timeout=idle_timeout)
+            except queue.Empty:
+                raise TimeoutError(f"Search timeout: no progress for {idle_timeout} seconds") from None
+            if item is finished:
+                break
+            yield item
+        future.result()  # Re-raise anything the iterator raised
+    finally:
+        future.cancel()
 
 # --- Initialize RAG System ---
+def shutdown_rag_system(current, loop):
+    """Close the current RAG system's pooled connections and stop the shared loop at interpreter exit"""
+    if not loop.is_running():
+        return
+    system = current.get("system")
+    if system is not None:
+        try:
+            asyncio.run_coroutine_threadsafe(system.close(), loop).result(timeout=5)
+        except Exception as e:
+            print(f"⚠️ RAG system shutdown error: {e!r}")
+    loop.call_soon_threadsafe(loop.stop)
+
 @st.cache_resource
-def get_rag_system():
+def get_current_rag_system():
+    """Slot for the live RAG system, with the process's single exit hook that closes it
+    
+    Rebuilds swap the system in the slot rather than registering another hook, so released
+    systems aren't kept alive by atexit.
+    """
+    current = {}
+    atexit.register(shutdown_rag_system, current, get_event_loop())
+    return current
+
+def release_rag_system(entry):
+    """Close a RAG system dropped from the resource cache (e.g. by clear()) without waiting on it"""
+    system, _ = entry
+    current = get_current_rag_system()
+    if current.get("system") is system:
+        del current["system"]
+    asyncio.run_coroutine_threadsafe(system.close(), get_event_loop())
+
+@st.cache_resource(on_release=release_rag_system)
+def start_rag_system():
+    """Begin initializing the RAG system on the shared loop, once per process"""
     system = SimpleRAGSystem()
-    # Use synchronous initialization to avoid event loop conflicts
+    get_current_rag_system()["system"] = system
+    return system, asyncio.run_coroutine_threadsafe(system.initialize(), get_event_loop())
+
+def get_rag_system():
+    """Return the RAG system, waiting for the background warm-up to finish if needed"""
+    system, initialized = start_rag_system()
     try:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        loop.run_until_complete(system.initialize())
-        loop.close()
+        initialized.result()
     except Exception as e:
-        st.warning(f"⚠️ Some RAG components couldn't initialize: {{e}}")
-        st.info("🌐 The system will use web search mode when local components aren't available.")
+        print(f"⚠️ Some RAG components couldn't initialize: {e}")
     return system
 
-rag_system = get_rag_system()
+# Kick off model and index loading now so the page renders while the system warms up
+start_rag_system()
 
 # --- Session State Management ---
-if 'query' not in st.session_state:
-    st.session_state.query = ""
-if 'result' not in st.session_state:
-    st.session_state.result = None
-if 'deep_dive_topic' not in st.session_state:
-    st.session_state.deep_dive_topic = None
-if 'show_instructions' not in st.session_state:
-    st.session_state.show_instructions = False
+SESSION_DEFAULTS = {"query": "", "result": None, "deep_dive_topic": None, "show_instructions": False}
+for key, value in SESSION_DEFAULTS.items():
+    st.session_state.setdefault(key, value)
+if 'surprise_seed' not in st.session_state:
+    # Seed kept per session so a sequence of Surprise Me picks can be replayed when debugging
+    st.session_state.surprise_seed = int(time.time())
+    st.session_state.surprise_rng = np.random.default_rng(st.session_state.surprise_seed)
 
 # Determine if we should show the fixed UI or normal layout
-has_results = st.session_state.query and st.session_state.result
-container_class = "with-results" if has_results else ""
+has_results = bool(st.session_state.query and st.session_state.result)
 
-# Start main UI container
-st.markdown(f'<div class="main-ui-container {{container_class}}">', unsafe_allow_html=True)
+# Start main UI container. Only two variants exist, so the markup is identical from rerun to rerun
+# unless results appear or go away; it must still be emitted each time or Streamlit drops it.
+st.markdown(MAIN_CONTAINER_OPEN_HTML[has_results], unsafe_allow_html=True)
 
 # --- Enhanced UI Components ---
 # Create the animated cosmic title
-cosmic_title_html = f'''
-<div class="cosmic-title-container">
-    <h1 class="cosmic-title">
-        <span class="title-text">{APP_TITLE}</span>
-    </h1>
-    <p class="cosmic-subtitle">{APP_SUBTITLE}</p>
-</div>
-'''
-
-st.markdown(cosmic_title_html, unsafe_allow_html=True)
-
-# --- System Status Indicator ---
-def show_system_status():
-    """Clean interface - no status display"""
-    pass
-
-# Removed status display for clean interface
+st.markdown(COSMIC_TITLE_HTML, unsafe_allow_html=True)
 
 # --- Search Bar and Buttons ---
-query = st.text_input(
-    "Ask a question:",
-    placeholder="e.g., What is the Artemis program?",
-    value=st.session_state.query,
-    key="query_input"
+# A form batches the input and buttons into one rerun on submit instead of one per widget edit;
+# Search comes first so pressing Enter submits it
+with st.form("search_form", clear_on_submit=False, border=False):
+    query = st.text_input(
+        "Ask a question:",
+        placeholder="e.g., What is the Artemis program?",
+        value=st.session_state.query,
+        key="query_input"
+    )
+
+    col1, col2, col3, col4 = st.columns([1, 1, 1, 1])
+    with col1:
+        search_clicked = st.form_submit_button("Search")
+    with col2:
+        surprise_clicked = st.form_submit_button("Surprise Me")
+    with col3:
+        instructions_clicked = st.form_submit_button("How to Use")
+
+# Submit handlers run after the form so the whole form lands in a single rerun
+if search_clicked:
+    st.session_state.query = query
+    st.session_state.result = None # Reset result
+    st.session_state.deep_dive_topic = None
+
+# Surprise Me falls back to these when no clean document title turns up
+SURPRISE_TOPICS = (
+    "the James Webb Space Telescope",
+    "the Artemis lunar mission",
+    "black holes and how they form",
+    "the search for exoplanets",
+    "Mars exploration and rovers",
+    "the International Space Station",
+    "dark matter and dark energy",
+    "the formation of galaxies",
+    "SpaceX Starship missions",
+    "the Hubble Space Telescope discoveries",
+    "solar flares and space weather",
+    "the search for extraterrestrial life",
+    "neutron stars and pulsars",
+    "planetary formation",
+    "space mining possibilities",
+    "the future of human space exploration",
 )
 
-col1, col2, col3, col4 = st.columns([1, 1, 1, 1])
+if surprise_clicked:
+    st.session_state.query = ""
+    st.session_state.result = None
+    st.session_state.deep_dive_topic = None
+    
+    # Try to pick a clean title from documents, otherwise use fallback
+    clean_query = None
+    rag_system = get_rag_system()
+    titles = rag_system.document_titles  # Parallel title list built once when the index loads
+    rng = st.session_state.surprise_rng
+    if titles:
+        # Try multiple random documents to find a clean title
+        for _ in range(5):
+            title = titles[int(rng.integers(len(titles)))]
+            # Check if title looks like a file path or is problematic
+            if title and not ('/' in title or '\\' in title or title.startswith('.')):
+                clean_query = f"Tell me about {title}"
+                break
+    
+    # Use fallback if no clean title found
+    if not clean_query:
+        clean_query = f"Tell me about {SURPRISE_TOPICS[int(rng.integers(len(SURPRISE_TOPICS)))]}"
+    
+    st.session_state.query = clean_query
+
+# How to Use panel content, built once at import
+INSTRUCTIONS_INTRO_MD = """<h3 style='color: rgba(255, 255, 255, 0.9); text-align: center; text-shadow: 0 2px 8px rgba(0, 0, 0, 0.4); font-weight: 300; letter-spacing: 1px; margin-bottom: 25px;'>How to Use CosmoRAG</h3>
+
+#### What is RAG?
+**RAG** (Retrieval-Augmented Generation) is an AI technique that enhances language models by retrieving relevant information from external knowledge sources before generating responses, improving accuracy and reducing hallucinations.
+
+#### Ask About Space
+Ask questions about **space exploration, astronomy, and the cosmos** - the system searches both curated space knowledge and the web.
+"""
+
+INSTRUCTIONS_DETAILS_MD = """#### Features
+- **Search:** Get AI-powered answers from multiple sources
+- **Surprise Me:** Explore random topics
 
-with col1:
-    if st.button("Search"):
-        st.session_state.query = query
-        st.session_state.result = None # Reset result
-        st.session_state.deep_dive_topic = None
+#### Search Sources
+- **Internal:** Curated knowledge base
+- **Web:** Real-time search results
+- **Smart routing** selects the best source
 
-with col2:
-    if st.button("Surprise Me"):
-        st.session_state.query = ""
-        st.session_state.result = None
-        st.session_state.deep_dive_topic = None
-        
-        # Define interesting space topics as fallback
-        space_topics = [
-            "the James Webb Space Telescope",
-            "the Artemis lunar mission",
-            "black holes and how they form",
-            "the search for exoplanets",
-            "Mars exploration and rovers",
-            "the International Space Station",
-            "dark matter and dark energy",
-            "the formation of galaxies",
-            "SpaceX Starship missions",
-            "the Hubble Space Telescope discoveries",
-            "solar flares and space weather",
-            "the search for extraterrestrial life",
-            "neutron stars and pulsars",
-            "planetary formation",
-            "space mining possibilities",
-            "the future of human space exploration"
-        ]
-        
-        # Try to pick a clean title from documents, otherwise use fallback
-        clean_query = None
-        if rag_system.documents:
-            # Try multiple random documents to find a clean title
-            for _ in range(5):
-                random_doc = random.choice(rag_system.documents)
-                title = random_doc.get('title', '')
-                # Check if title looks like a file path or is problematic
-                if title and not ('/' in title or '\\' in title or title.startswith('.')):
-                    clean_query = f"Tell me about {title}"
-                    break
-        
-        # Use fallback if no clean title found
-        if not clean_query:
-            clean_query = f"Tell me about {random.choice(space_topics)}"
-        
-        st.session_state.query = clean_query
+<p style='text-align: center; color: rgba(255, 255, 255, 0.6); font-size: 12px; font-style: italic; margin-top: 15px;'>Specialized AI for space exploration enthusiasts</p>
+"""
 
-with col3:
-    if st.button("How to Use"):
-        st.session_state.show_instructions = not st.session_state.show_instructions
+if instructions_clicked:
+    st.session_state.show_instructions = not st.session_state.show_instructions
 
 if st.session_state.show_instructions:
     # Create a styled container for the instructions
     st.markdown("""
-    <div style='margin: 20px 0; background: rgba(0, 0, 0, 0.15); border-radius: 20px; padding: 30px; border: 1px solid rgba(255, 255, 255, 0.1); backdrop-filter: blur(20px);'>
+    <div class='instructions-card'>
     """, unsafe_allow_html=True)
     
-    # Title
-    st.markdown("<h3 style='color: rgba(255, 255, 255, 0.9); text-align: center; text-shadow: 0 2px 8px rgba(0, 0, 0, 0.4); font-weight: 300; letter-spacing: 1px; margin-bottom: 25px;'>How to Use CosmoRAG</h3>", unsafe_allow_html=True)
-    
-    # What is RAG section
-    st.markdown("#### What is RAG?")
-    st.write("**RAG** (Retrieval-Augmented Generation) is an AI technique that enhances language models by retrieving relevant information from external knowledge sources before generating responses, improving accuracy and reducing hallucinations.")
-    
-    # Ask About Space section  
-    st.markdown("#### Ask About Space")
-    st.write("Ask questions about **space exploration, astronomy, and the cosmos** - the system searches both curated space knowledge and the web.")
-    
+    # Sections go out as two markdown blobs around the examples box rather than one element per line
+    st.markdown(INSTRUCTIONS_INTRO_MD, unsafe_allow_html=True)
     st.info('**Examples:** "What is the James Webb Space Telescope?", "Tell me about Mars exploration missions", "How do black holes form?", "What are exoplanets?"')
-    
-    # Features section
-    st.markdown("#### Features")
-    st.write("""
-    - **Search:** Get AI-powered answers from multiple sources
-    - **Surprise Me:** Explore random topics  
-    """)
-    
-    
-    # Search Capabilities section
-    st.markdown("#### Search Sources")
-    st.write("""
-    - **Internal:** Curated knowledge base
-    - **Web:** Real-time search results
-    - **Smart routing** selects the best source
-    """)
-    
-    # Footer message
-    st.markdown("<p style='text-align: center; color: rgba(255, 255, 255, 0.6); font-size: 12px; font-style: italic; margin-top: 15px;'>Specialized AI for space exploration enthusiasts</p>", unsafe_allow_html=True)
+    st.markdown(INSTRUCTIONS_DETAILS_MD, unsafe_allow_html=True)
     
     # Close the container
     st.markdown("</div>", unsafe_allow_html=True)
@@ -1081,7 +347,7 @@ if st.session_state.show_instructions:
 @st.cache_data
 def load_space_facts():
     """Load space facts from the scraped data"""
-    facts_path = Path("storage/space_facts.json")
+    facts_path = current_dir / "storage/space_facts.json"
     if facts_path.exists():
         try:
             with open(facts_path, 'r', encoding='utf-8') as f:
@@ -1098,89 +364,132 @@ def load_space_facts():
         {"fact": "Light from the Sun takes 8 minutes to reach Earth.", "source": "Physics"}
     ]
 
-# Display space facts section (only when no query results are shown)
-if not (st.session_state.query and st.session_state.result):
-    st.markdown("---")
-    st.markdown("### Did You Know? Space Facts")
+@st.fragment
+def show_space_facts():
+    """Render a random space fact; "New Fact" reruns only this fragment, not the whole page"""
+    st.markdown("---\n### Did You Know? Space Facts")
     
     space_facts = load_space_facts()
     if space_facts:
         # Select a random fact to display
         fact_data = random.choice(space_facts)
         
+        # One element for the whole card; its styling lives in the cached stylesheet
         st.markdown(
-            f"""
-            <div style='margin-top: 20px; background: transparent; border: 2px solid rgba(255, 165, 0, 0.3); border-radius: 15px; padding: 25px; text-align: center; box-shadow: 0 4px 20px rgba(255, 165, 0, 0.1);'>
-                <h4 style='color: #FFB347; margin-bottom: 8px; text-shadow: 0 2px 8px rgba(0, 0, 0, 0.4); font-weight: 400; letter-spacing: 1px; font-size: 1.3rem;'>⭐ Space Facts ⭐</h4>\n                <p style='font-size: 12px; color: rgba(255, 165, 0, 0.8); margin-bottom: 18px; text-transform: uppercase; letter-spacing: 2px; font-weight: 500;'>Did You Know?</p>
-                <p style='font-size: 18px; line-height: 1.7; margin-bottom: 15px; color: rgba(255, 255, 255, 0.9); text-shadow: 0 2px 6px rgba(0, 0, 0, 0.4); font-weight: 400; background: rgba(255, 165, 0, 0.05); padding: 15px; border-radius: 10px; border-left: 4px solid #FFB347;'>{fact_data['fact']}</p>
-                <p style='font-size: 13px; color: rgba(255, 165, 0, 0.7); margin: 0; text-shadow: 0 1px 4px rgba(0, 0, 0, 0.3); font-style: italic;'>
-                    📚 Source: {fact_data['source']}
-                </p>
-            </div>
-            """,
+            f"<div class='fact-card'>"
+            f"<h4>⭐ Space Facts ⭐</h4>"
+            f"<p class='fact-label'>Did You Know?</p>"
+            f"<p class='fact-text'>{fact_data['fact']}</p>"
+            f"<p class='fact-source'>📚 Source: {fact_data['source']}</p>"
+            f"</div>",
             unsafe_allow_html=True
         )
         
-        # Add some spacing before the button
-        st.markdown("<div style='margin-top: 25px;'></div>", unsafe_allow_html=True)
-        
-        # Add a refresh button for new fact - centered with better spacing
+        # Clicking a button inside a fragment already reruns the fragment with a new fact
         col1, col2, col3 = st.columns([2, 1, 2])
         with col2:
-            if st.button("New Fact", key="new_fact_btn"):
-                st.rerun()
+            st.button("New Fact", key="new_fact_btn")
+
+# Display space facts section (only when no query results are shown)
+if not has_results:
+    show_space_facts()
 
 # Close the main UI container
 st.markdown('</div>', unsafe_allow_html=True)
 
-# --- Simple NASA Background ---
-# Simple background with NASA image
-simple_background = """
-<div class="cosmic-overlay"></div>
-<div class="text-readability-overlay"></div>
-"""
-
-st.markdown(simple_background, unsafe_allow_html=True)
-
-
 # --- Async Query Handler ---
-def run_search_query(query: str):
-    """Run search query with proper event loop handling"""
+RESULT_CACHE_TTL = 600  # Seconds a finished answer is reused for the same question
+RESULT_CACHE_MAX_ENTRIES = 512  # Least recently used answers are evicted past this many
+SEARCH_IDLE_TIMEOUT = 60  # Seconds without any event before a search counts as stalled; the backend sends progress events while it waits on a model
+
+@st.cache_resource
+def get_result_cache():
+    """Process-wide LRU cache of finished search results, shared across reruns and sessions"""
+    return OrderedDict(), threading.Lock(), {"hits": 0, "misses": 0}
+
+def normalize_query(query: str) -> str:
+    """Normalize a query so trivially different spellings share one cache entry"""
+    return " ".join(query.split()).casefold()
+
+def get_cached_result(normalized_query: str):
+    """Return a cached result that is still fresh, or None"""
+    cache, lock, stats = get_result_cache()
+    with lock:
+        entry = cache.get(normalized_query)
+        if entry and time.time() - entry[0] < RESULT_CACHE_TTL:
+            cache.move_to_end(normalized_query)
+            stats["hits"] += 1
+            return entry[1]
+        cache.pop(normalized_query, None)
+        stats["misses"] += 1
+    return None
+
+def store_cached_result(normalized_query: str, result: dict):
+    """Remember a model-generated result; errors and fallback answers are never cached so the next attempt retries"""
+    if result.get("degraded") or result.get("method") == "error":
+        return
+    cache, lock, _ = get_result_cache()
+    with lock:
+        cache[normalized_query] = (time.time(), result)
+        cache.move_to_end(normalized_query)
+        while len(cache) > RESULT_CACHE_MAX_ENTRIES:
+            cache.popitem(last=False)
+
+def response_card_html(text: str) -> str:
+    """HTML for the answer card"""
+    return f"<div class='response-card'>{text}</div>"
+
+def source_cards_html(sources: list) -> str:
+    """HTML for all source cards, empty when there are none"""
+    # Titles and URLs come from scraped pages, so escape them before they land in raw HTML
+    return "".join(
+        f"<div class='source-card'>"
+        f"<h4>{html.escape(str(source.get('title', 'Unknown Title')))}</h4>"
+        f"<p><b>Source:</b> <a href='{html.escape(str(source.get('source')))}' target='_blank'>{html.escape(str(source.get('source')))}</a></p>"
+        f"<p><b>Type:</b> {html.escape(str(source.get('source_type', 'N/A')))}</p>"
+        f"</div>"
+        for source in sources
+    )
+
+def render_response(placeholder, text: str):
+    """Render the answer card into its placeholder"""
+    placeholder.markdown(response_card_html(text), unsafe_allow_html=True)
+
+def render_sources(placeholder, sources: list):
+    """Render all source cards with a single markdown call"""
+    if not sources:
+        placeholder.info("No sources found.")
+        return
+    placeholder.markdown(source_cards_html(sources), unsafe_allow_html=True)
+
+def stream_search_query(query: str, response_placeholder, sources_placeholder):
+    """Drive the streaming search, painting sources and tokens as they arrive"""
+    rag_system = get_rag_system()
+    buffer = ""
+    result = None
+    # Events are produced on the loop thread but rendered here, where the Streamlit context lives
+    for event in iterate_async(rag_system.search_query_stream(query), idle_timeout=SEARCH_IDLE_TIMEOUT):
+        if event["type"] == "sources":
+            render_sources(sources_placeholder, event["sources"])
+        elif event["type"] == "token":
+            buffer += event["text"]
+            render_response(response_placeholder, buffer)
+        elif event["type"] == "done":
+            result = event["result"]
+        # "progress" events carry no content; they only reset the idle timeout while queued or generating
+    return result
+
+def run_search_query(query: str, response_placeholder, sources_placeholder):
+    """Run search query, serving repeat questions from the result cache"""
+    # Keyed by corpus version so answers citing a replaced index are never served
+    normalized_query = f"{get_rag_system().corpus_version}:{normalize_query(query)}"
+    cached = get_cached_result(normalized_query)
+    if cached:
+        return cached
     try:
-        # Try to get existing event loop
-        try:
-            loop = asyncio.get_event_loop()
-            if loop.is_running():
-                # If loop is running, create a new one
-                import threading
-                result = [None]
-                exception = [None]
-                
-                def run_in_thread():
-                    try:
-                        new_loop = asyncio.new_event_loop()
-                        asyncio.set_event_loop(new_loop)
-                        result[0] = new_loop.run_until_complete(rag_system.search_query(query))
-                        new_loop.close()
-                    except Exception as e:
-                        exception[0] = e
-                
-                thread = threading.Thread(target=run_in_thread)
-                thread.start()
-                thread.join()
-                
-                if exception[0]:
-                    raise exception[0]
-                return result[0]
-            else:
-                return loop.run_until_complete(rag_system.search_query(query))
-        except RuntimeError:
-            # No event loop, create a new one
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            result = loop.run_until_complete(rag_system.search_query(query))
-            loop.close()
-            return result
+        result = stream_search_query(query, response_placeholder, sources_placeholder)
+        store_cached_result(normalized_query, result)
+        return result
     except Exception as e:
         error_msg = str(e)
         if "connection" in error_msg.lower() or "timeout" in error_msg.lower():
@@ -1200,39 +509,37 @@ def run_search_query(query: str):
         }
 
 # --- Main Logic ---
-if st.session_state.query:
-    with st.spinner("Searching the cosmos..."):
+def show_results():
+    """Render the answer and sources for the current query"""
+    if st.session_state.query:
+        # Start results container
+        st.markdown('<div class="results-container">', unsafe_allow_html=True)
+        
+        # Placeholders are filled as the answer streams in, then with the final result
+        st.markdown("### Response")
+        response_placeholder = st.empty()
+        st.markdown("### Sources")
+        sources_placeholder = st.empty()
+        
         if not st.session_state.result:
-             st.session_state.result = run_search_query(st.session_state.query)
+            with st.spinner("Searching the cosmos..."):
+                st.session_state.result = run_search_query(st.session_state.query, response_placeholder, sources_placeholder)
 
         result = st.session_state.result
         
         if result:
-            # Start results container
-            st.markdown('<div class="results-container">', unsafe_allow_html=True)
-            
-            # Display Response
-            st.markdown("### Response")
-            st.markdown(f"<div class='response-card'>{result.get('response', 'No response generated.')}</div>", unsafe_allow_html=True)
+            render_response(response_placeholder, result.get('response', 'No response generated.'))
+            render_sources(sources_placeholder, result.get("sources", []))
+
+        # Close results container
+        st.markdown('</div>', unsafe_allow_html=True)
 
-            # Display Sources
-            st.markdown("### Sources")
-            sources = result.get("sources", [])
-            if sources:
-                for source in sources:
-                    with st.container():
-                        st.markdown(
-                            f"""
-                            <div class='source-card'>
-                                <h4>{source.get('title', 'Unknown Title')}</h4>
-                                <p><b>Source:</b> <a href='{source.get('source')}' target='_blank'>{source.get('source')}</a></p>
-                                <p><b>Type:</b> {source.get('source_type', 'N/A')}</p>
-                            </div>
-                            """,
-                            unsafe_allow_html=True
-                        )
-            else:
-                st.info("No sources found.")
+show_results()
 
-            # Close results container
-            st.markdown('</div>', unsafe_allow_html=True)
+# Cache sizes and hit rates for tuning TTLs and limits; only shown when DEBUG is set
+if os.getenv("DEBUG"):
+    with st.expander("Cache stats"):
+        cache, lock, stats = get_result_cache()
+        with lock:
+            result_cache_stats = {"entries": len(cache), "max_entries": RESULT_CACHE_MAX_ENTRIES, **stats}
+        st.json({"result_cache": result_cache_stats, **get_rag_system().get_cache_stats()})
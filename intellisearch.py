@@ -9,30 +9,56 @@ import asyncio
 import time
 import sys
 import os
+import html
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
 import aiohttp
 import openai
 from dotenv import load_dotenv
 
-# Add the current directory to the path for imports
+# Add the current directory to the path for imports (once - Streamlit re-executes this on every rerun)
 current_dir = Path(__file__).parent
-sys.path.insert(0, str(current_dir))
+if str(current_dir) not in sys.path:
+    sys.path.insert(0, str(current_dir))
 
 try:
     from hybrid_rag_system import HybridRAGSystem
-    RAG_SYSTEM = HybridRAGSystem()
     RAG_AVAILABLE = True
     RAG_ERROR = None
 except ImportError as e:
     # Handle graceful degradation
-    RAG_SYSTEM = None
+    HybridRAGSystem = None
     RAG_AVAILABLE = False
     RAG_ERROR = str(e)
 
 # Load environment variables
 load_dotenv()
 
+# Filler that carries no question: answered with a canned prompt instead of a RAG round-trip
+FILLER_QUERIES = frozenset({"hi", "hello", "hey", "thanks", "thank you", "ok", "okay", "test", "yes", "no"})
+FILLER_RESPONSE = "Please ask a specific question - for example about space missions, astronomy or technology."
+FILLER_PUNCTUATION = str.maketrans("", "", "!?.,")  # Stripped in one pass before matching
+FILLER_RESULT = {'response': FILLER_RESPONSE, 'method': 'skipped', 'confidence': 1.0, 'query_time': 0.0}
+
+# Retrieval settings; they also key the shared RAG system cache
+SIMILARITY_THRESHOLD = 0.4
+MAX_RESULTS = 5
+ENABLE_WEB_FALLBACK = True
+
+# Answers are reused when the same question is searched again within this many seconds
+RESULT_CACHE_TTL = 300
+RESULT_CACHE_MAX_ENTRIES = 64  # Per session; the least recently used answer is dropped past this
+# Placeholder texts the LLM helpers return instead of an answer; these are retried, never cached
+LLM_FAILURE_RESPONSES = frozenset({
+    "No response generated",
+    "Unable to generate response",
+    "Service temporarily unavailable",
+    "Unable to process request",
+    "Service currently unavailable",
+})
+
 # Configure Streamlit
 st.set_page_config(
     page_title="IntelliSearch",
@@ -42,376 +68,144 @@ st.set_page_config(
 )
 
 # Enhanced professional CSS with clean animated background
-st.markdown("""
-<style>
-    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&family=JetBrains+Mono:wght@300;400;600;700&display=swap');
-    
-    /* Professional Deep Space Background */
-    .stApp {
-        background: 
-            radial-gradient(ellipse at top, rgba(15, 15, 30, 0.8) 0%, rgba(0, 0, 0, 0.9) 50%, #000000 100%),
-            linear-gradient(180deg, #000000 0%, #050510 25%, #0a0a15 50%, #050510 75%, #000000 100%);
-        color: #e1e8ed;
-        font-family: 'Inter', sans-serif;
-        min-height: 100vh;
-        position: relative;
-        overflow-x: hidden;
-        padding-bottom: 2rem;
-    }
-    
-    /* Enhanced Solar System Animation */
-    .stApp::before {
-        content: '';
-        position: fixed;
-        top: 50%;
-        left: 50%;
-        width: 35px;
-        height: 35px;
-        background: radial-gradient(circle, #FFD700 0%, #FF8C00 70%, #FF6B00 100%);
-        border-radius: 50%;
-        transform: translate(-50%, -50%);
-        box-shadow: 
-            0 0 40px rgba(255, 215, 0, 0.9),
-            0 0 80px rgba(255, 140, 0, 0.6),
-            0 0 120px rgba(255, 107, 0, 0.3),
-            0 0 160px rgba(255, 69, 0, 0.1);
-        pointer-events: none;
-        z-index: -1;
-        animation: sunPulse 6s ease-in-out infinite alternate;
-    }
-    
-    @keyframes sunPulse {
-        0% { 
-            box-shadow: 
-                0 0 40px rgba(255, 215, 0, 0.9),
-                0 0 80px rgba(255, 140, 0, 0.6),
-                0 0 120px rgba(255, 107, 0, 0.3);
-        }
-        100% { 
-            box-shadow: 
-                0 0 50px rgba(255, 215, 0, 1),
-                0 0 100px rgba(255, 140, 0, 0.8),
-                0 0 150px rgba(255, 107, 0, 0.4);
-        }
-    }
+@st.cache_data(show_spinner=False)
+def load_css(path: str) -> str:
+    """Read a stylesheet once per process instead of rebuilding it on every rerun"""
+    return Path(path).read_text()
 
-    /* Professional Starfield */
-    .stApp::after {
-        content: '';
-        position: fixed;
-        top: 0;
-        left: 0;
-        width: 100vw;
-        height: 100vh;
-        background: 
-            radial-gradient(1px 1px at 20px 30px, rgba(255, 255, 255, 0.3), transparent),
-            radial-gradient(1px 1px at 40px 70px, rgba(255, 255, 255, 0.2), transparent),
-            radial-gradient(1px 1px at 90px 40px, rgba(255, 255, 255, 0.3), transparent),
-            radial-gradient(1px 1px at 130px 80px, rgba(255, 255, 255, 0.2), transparent);
-        background-repeat: repeat;
-        background-size: 500px 200px;
-        pointer-events: none;
-        z-index: -2;
-        opacity: 0.6;
-        animation: starTwinkle 8s ease-in-out infinite alternate;
-    }
-    
-    @keyframes starTwinkle {
-        0% { opacity: 0.4; }
-        100% { opacity: 0.7; }
-    }
-    
-    /* Enhanced Input Styling */
-    .stTextInput > div > div > input {
-        background: rgba(15, 15, 35, 0.95) !important;
-        border: 2px solid rgba(100, 255, 218, 0.4) !important;
-        border-radius: 25px !important;
-        color: #f8fafc !important;
-        padding: 1.5rem 2rem !important;
-        font-size: 1.25rem !important;
-        font-weight: 500 !important;
-        font-family: 'Inter', sans-serif !important;
-        box-shadow: 0 10px 40px rgba(0, 0, 0, 0.4) !important;
-        backdrop-filter: blur(20px) !important;
-        transition: all 0.4s cubic-bezier(0.4, 0, 0.2, 1) !important;
-        width: 100% !important;
-        box-sizing: border-box !important;
-        margin: 0 !important;
-    }
-    
-    .stTextInput > div {
-        padding: 0 !important;
-        margin: 0 !important;
-    }
-    
-    .stTextInput {
-        margin: 2rem 0 !important;
-        padding: 0 1rem !important;
-    }
-    
-    .stTextInput > div > div > input:focus {
-        border-color: rgba(0, 255, 136, 0.6) !important;
-        border-left-color: #00ff88 !important;
-        box-shadow: 
-            0 0 30px rgba(0, 255, 136, 0.3),
-            0 15px 50px rgba(0, 0, 0, 0.4) !important;
-        outline: none !important;
-        transform: translateY(-2px) !important;
-    }
-    
-    .stTextInput > div > div > input::placeholder {
-        color: rgba(226, 232, 240, 0.6) !important;
-        font-style: italic;
-    }
-    
-    /* Enhanced Button Styling */
-    .stButton button {
-        background: linear-gradient(135deg, 
-            rgba(0, 255, 136, 0.9) 0%, 
-            rgba(100, 255, 218, 0.8) 50%, 
-            rgba(0, 255, 136, 0.9) 100%) !important;
-        border: none !important;
-        border-radius: 20px !important;
-        color: #0f172a !important;
-        padding: 1.25rem 3rem !important;
-        font-size: 1.125rem !important;
-        font-weight: 600 !important;
-        font-family: 'Inter', sans-serif !important;
-        cursor: pointer !important;
-        transition: all 0.4s cubic-bezier(0.4, 0, 0.2, 1) !important;
-        text-transform: uppercase !important;
-        letter-spacing: 0.5px !important;
-        box-shadow: 
-            0 10px 40px rgba(0, 255, 136, 0.3),
-            0 5px 20px rgba(0, 0, 0, 0.2) !important;
-    }
-    
-    .stButton button:hover {
-        transform: translateY(-3px) scale(1.02) !important;
-        box-shadow: 
-            0 15px 50px rgba(0, 255, 136, 0.4),
-            0 8px 30px rgba(0, 0, 0, 0.3) !important;
-    }
-    
-    /* Result Cards */
-    .result-card {
-        background: rgba(15, 15, 35, 0.85);
-        border: 1px solid rgba(100, 255, 218, 0.25);
-        border-radius: 20px;
-        padding: 2rem;
-        margin: 1.5rem 0;
-        color: #f1f5f9;
-        font-family: 'Inter', sans-serif;
-        backdrop-filter: blur(20px);
-        box-shadow: 
-            0 10px 40px rgba(0, 0, 0, 0.3),
-            0 0 60px rgba(100, 255, 218, 0.1);
-        transition: all 0.4s cubic-bezier(0.4, 0, 0.2, 1);
-        border-left: 4px solid transparent;
-    }
-    
-    .result-card:hover {
-        border-color: rgba(0, 255, 136, 0.4);
-        border-left-color: #00ff88;
-        transform: translateY(-6px) scale(1.02);
-        box-shadow: 
-            0 20px 60px rgba(0, 0, 0, 0.4),
-            0 0 80px rgba(0, 255, 136, 0.2);
-    }
-    
-    /* AI Response */
-    .ai-response {
-        background: rgba(15, 15, 35, 0.9);
-        border: 2px solid rgba(100, 255, 218, 0.3);
-        border-radius: 25px;
-        padding: 2.5rem;
-        margin: 2rem 0;
-        color: #f1f5f9;
-        font-family: 'Inter', sans-serif;
-        backdrop-filter: blur(25px);
-        box-shadow: 
-            0 15px 50px rgba(0, 0, 0, 0.4),
-            0 0 80px rgba(100, 255, 218, 0.15);
-        border-left: 6px solid #00ff88;
-    }
-    
-    /* Professional Header Styling */
-    .main-header {
-        text-align: center;
-        padding: 4rem 2rem 3rem 2rem;
-        margin-bottom: 2rem;
-        position: relative;
-        z-index: 50;
-    }
-    
-    .app-title {
-        font-size: 4rem;
-        font-weight: 700;
-        background: linear-gradient(135deg, 
-            #ffffff 0%, 
-            #64ffda 25%, 
-            #00ff88 50%, 
-            #64ffda 75%, 
-            #ffffff 100%);
-        background-size: 300% 300%;
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        background-clip: text;
-        margin-bottom: 1rem;
-        text-shadow: 0 0 30px rgba(100, 255, 218, 0.3);
-        animation: gradientShift 4s ease-in-out infinite alternate;
-        letter-spacing: 2px;
-        line-height: 1.1;
-    }
-    
-    .app-subtitle {
-        font-size: 1.5rem;
-        font-weight: 500;
-        color: #e2e8f0;
-        margin-bottom: 1rem;
-        opacity: 0.9;
-        letter-spacing: 1px;
-    }
-    
-    .header-description {
-        font-size: 1.2rem;
-        font-weight: 400;
-        color: #cbd5e0;
-        opacity: 0.8;
-        font-style: italic;
-        max-width: 600px;
-        margin: 0 auto;
-        line-height: 1.6;
-    }
+# Emitted every rerun (Streamlit drops elements a rerun skips), but read from disk only once
+st.markdown(f"<style>{load_css(str(current_dir / 'static/css/intellisearch.css'))}</style>", unsafe_allow_html=True)
 
-    @keyframes gradientShift {
-        0% { background-position: 0% 50%; }
-        100% { background-position: 100% 50%; }
-    }
-    
-    /* Help Button Styling */
-    .help-button {
-        position: fixed;
-        bottom: 2rem;
-        right: 2rem;
-        z-index: 1000;
-        background: linear-gradient(135deg, 
-            rgba(100, 255, 218, 0.9) 0%, 
-            rgba(0, 255, 136, 0.8) 100%) !important;
-        border: none !important;
-        border-radius: 50% !important;
-        width: 60px !important;
-        height: 60px !important;
-        font-size: 1.5rem !important;
-        color: #0f172a !important;
-        cursor: pointer !important;
-        transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1) !important;
-        box-shadow: 
-            0 8px 25px rgba(0, 255, 136, 0.3),
-            0 4px 15px rgba(0, 0, 0, 0.2) !important;
-        display: flex !important;
-        align-items: center !important;
-        justify-content: center !important;
-    }
-    
-    .help-button:hover {
-        transform: translateY(-3px) scale(1.1) !important;
-        box-shadow: 
-            0 12px 35px rgba(0, 255, 136, 0.4),
-            0 6px 20px rgba(0, 0, 0, 0.3) !important;
-    }
-    
-    /* Help Modal Styling */
-    .help-modal {
-        position: fixed;
-        top: 0;
-        left: 0;
-        width: 100vw;
-        height: 100vh;
-        background: rgba(0, 0, 0, 0.8);
-        z-index: 2000;
-        display: flex;
-        align-items: center;
-        justify-content: center;
-        backdrop-filter: blur(10px);
-    }
-    
-    .help-content {
-        background: rgba(15, 15, 35, 0.95);
-        border: 2px solid rgba(100, 255, 218, 0.3);
-        border-radius: 25px;
-        padding: 3rem;
-        max-width: 600px;
-        max-height: 80vh;
-        overflow-y: auto;
-        color: #f1f5f9;
-        font-family: 'Inter', sans-serif;
-        backdrop-filter: blur(25px);
-        box-shadow: 
-            0 20px 60px rgba(0, 0, 0, 0.5),
-            0 0 100px rgba(100, 255, 218, 0.2);
-        border-left: 6px solid #00ff88;
-        position: relative;
-    }
-    
-    .help-close {
-        position: absolute;
-        top: 1rem;
-        right: 1rem;
-        background: none;
-        border: none;
-        color: #64ffda;
-        font-size: 2rem;
-        cursor: pointer;
-        transition: all 0.3s ease;
-    }
-    
-    .help-close:hover {
-        color: #00ff88;
-        transform: scale(1.1);
-    }
-    
-    /* Enhanced details/summary styling */
-    details summary {
-        transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1) !important;
-    }
-    
-    details summary:hover {
-        transform: translateY(-2px) !important;
-        box-shadow: 
-            0 8px 25px rgba(0, 255, 136, 0.3),
-            0 4px 15px rgba(0, 0, 0, 0.2) !important;
-    }
-    
-    details[open] summary {
-        border-bottom-left-radius: 0 !important;
-        border-bottom-right-radius: 0 !important;
-        margin-bottom: 0 !important;
-    }
-    
-    /* Hide Streamlit elements */
-    .stDeployButton { display: none; }
-    #MainMenu { visibility: hidden; }
-    footer { visibility: hidden; }
-    header { visibility: hidden; }
-</style>
-""", unsafe_allow_html=True)
+def build_rag_system(similarity_threshold: float, enable_web_fallback: bool, max_results: int):
+    """Construct, initialize and configure a RAG system; raises RuntimeError if initialization fails"""
+    rag_system = HybridRAGSystem()
+    if not asyncio.run(rag_system.initialize()):
+        raise RuntimeError("RAG system failed to initialize")
+    rag_system.configure(
+        similarity_threshold=similarity_threshold,
+        enable_web_fallback=enable_web_fallback,
+        max_local_results=max_results,
+        max_web_results=max_results
+    )
+    return rag_system
+
+@st.cache_resource(show_spinner=False)
+def start_rag_system(similarity_threshold: float, enable_web_fallback: bool, max_results: int):
+    """Begin building the shared RAG system on a worker thread, once per process
+    
+    Returns a future, so callers can render the page while initialization runs.
+    """
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rag-init")
+    return executor.submit(build_rag_system, similarity_threshold, enable_web_fallback, max_results)
+
+# Kick off initialization at import so it runs while the page renders and the user types
+if RAG_AVAILABLE:
+    start_rag_system(SIMILARITY_THRESHOLD, ENABLE_WEB_FALLBACK, MAX_RESULTS)
+
+def get_rag_system(similarity_threshold: float, enable_web_fallback: bool, max_results: int):
+    """Wait for the shared RAG system; a failed build is forgotten so the next caller retries"""
+    try:
+        return start_rag_system(similarity_threshold, enable_web_fallback, max_results).result()
+    except Exception:
+        start_rag_system.clear()
+        raise
+
+# Static header markup, built once at import
+HEADER_HTML = """
+<div class="main-header">
+    <div class="app-title">🚀 IntelliSearch</div>
+    <div class="app-subtitle">
+        Advanced Space Intelligence & Research System
+    </div>
+    <div class="header-description">
+        Explore the cosmos through AI-powered knowledge discovery
+    </div>
+</div>
+"""
+
+# Token metric card, filled in with str.format on every rerun that shows metrics
+METRIC_CARD_TEMPLATE = (
+    '<div style="background: rgba(15, 15, 35, 0.8); border: 1px solid rgba(100, 255, 218, 0.3); border-radius: 15px; padding: 1rem; text-align: center; backdrop-filter: blur(20px);">'
+    '<span style="display: block; font-size: 1.5rem; font-weight: 700; color: #64ffda; margin-bottom: 0.5rem;">{value}</span>'
+    '<span style="display: block; font-size: 0.9rem; font-weight: 500; color: #cbd5e0; text-transform: uppercase; letter-spacing: 1px;">{label}</span>'
+    '</div>'
+)
+TOKEN_METRICS = (
+    ("query_tokens", "Query Tokens"),
+    ("response_tokens", "Response Tokens"),
+    ("session_tokens", "Session Total"),
+)
+
+# "How to Use" panel below the search box; pure HTML, so it goes out through st.html and skips markdown parsing
+HELP_HTML = """
+<div style="text-align: center; margin: 3rem 0 2rem 0;">
+    <details style="background: rgba(15, 15, 35, 0.8); border: 2px solid rgba(100, 255, 218, 0.3); border-radius: 20px; padding: 0; margin: 0 auto; max-width: 700px; backdrop-filter: blur(20px);">
+        <summary style="background: linear-gradient(135deg, rgba(100, 255, 218, 0.9) 0%, rgba(0, 255, 136, 0.8) 100%); color: #0f172a; padding: 1.5rem 2rem; border-radius: 18px; cursor: pointer; font-weight: 600; font-size: 1.2rem; text-align: center; transition: all 0.3s ease; user-select: none; list-style: none; display: flex; align-items: center; justify-content: center; gap: 0.75rem;">
+            📚 How to Use IntelliSearch 
+            <span style="font-size: 0.9rem; opacity: 0.8;">(Click to expand)</span>
+        </summary>
+        <div style="padding: 2.5rem; color: #f1f5f9; line-height: 1.7;">
+            <h3 style="color: #00ff88; margin-bottom: 1rem; display: flex; align-items: center; gap: 0.5rem;">🚀 Getting Started</h3>
+            <ul style="margin-bottom: 2rem; padding-left: 1.5rem;">
+                <li style="margin-bottom: 0.75rem;"><strong style="color: #64ffda;">Ask Questions</strong>: Enter your query in the search box above</li>
+                <li style="margin-bottom: 0.75rem;"><strong style="color: #64ffda;">Be Specific</strong>: More detailed questions get better answers</li>
+                <li style="margin-bottom: 0.75rem;"><strong style="color: #64ffda;">Explore Topics</strong>: Try space, technology, recruitment, or scientific concepts</li>
+            </ul>
+
+            <h3 style="color: #00ff88; margin-bottom: 1rem; display: flex; align-items: center; gap: 0.5rem;">⚡ System Capabilities</h3>
+            <ul style="margin-bottom: 2rem; padding-left: 1.5rem;">
+                <li style="margin-bottom: 0.75rem;"><strong style="color: #64ffda;">Multi-Source Search</strong>: Searches both local knowledge bases and web sources</li>
+                <li style="margin-bottom: 0.75rem;"><strong style="color: #64ffda;">Space Intelligence</strong>: Specialized in space exploration and astronomy</li>
+                <li style="margin-bottom: 0.75rem;"><strong style="color: #64ffda;">Technical Analysis</strong>: Handles complex scientific and technical queries</li>
+            </ul>
+
+            <h3 style="color: #00ff88; margin-bottom: 1rem; display: flex; align-items: center; gap: 0.5rem;">💡 Tips for Best Results</h3>
+            <ul style="padding-left: 1.5rem;">
+                <li style="margin-bottom: 0.75rem;">Use natural language - ask as you would ask a human expert</li>
+                <li style="margin-bottom: 0.75rem;">Include context when relevant (e.g., "for beginners" or "technical details")</li>
+                <li style="margin-bottom: 0.75rem;">Ask follow-up questions to dive deeper into topics</li>
+            </ul>
+        </div>
+    </details>
+</div>
+"""
+
+# Source card in the results expander; content is cut to SOURCE_PREVIEW_CHARS before escaping
+SOURCE_CARD_TEMPLATE = (
+    '<div class="result-card">'
+    '<div class="result-content">{preview}</div>'
+    '<div style="margin-top: 1rem; color: #64ffda; font-size: 0.9rem;">Similarity: {similarity:.1%}</div>'
+    '</div>'
+)
+SOURCE_PREVIEW_CHARS = 400
+
+def source_card_html(source: Dict[str, Any]) -> str:
+    """HTML for one source card, looking each field up once and escaping only the preview"""
+    content = source.get("content", "")
+    preview = html.escape(content[:SOURCE_PREVIEW_CHARS])
+    if len(content) > SOURCE_PREVIEW_CHARS:
+        preview += "..."
+    return SOURCE_CARD_TEMPLATE.format(preview=preview, similarity=source.get("similarity", 0.0))
 
 class IntelliSearch:
     """Enhanced Professional RAG System with Advanced UI"""
     
     def __init__(self):
-        self.rag_system = RAG_SYSTEM
+        self.rag_system = None
         self.ollama_available = False
         self.openai_client = None
         self.is_initialized = False
         self.system_status = None
+        # Display names of enabled capabilities, frozen once the system status is known
+        self.active_capabilities: Tuple[str, ...] = ()
         
         # Enhanced system configuration
-        self.similarity_threshold = 0.4
-        self.max_results = 5
-        self.enable_web_fallback = True
+        self.similarity_threshold = SIMILARITY_THRESHOLD
+        self.max_results = MAX_RESULTS
+        self.enable_web_fallback = ENABLE_WEB_FALLBACK
         self.query_history = []
+        # Normalized question -> (timestamp, RAG result)
+        self.result_cache: OrderedDict[str, Tuple[float, Dict[str, Any]]] = OrderedDict()
         self.performance_metrics = {
             'total_queries': 0,
             'avg_response_time': 0,
@@ -450,30 +244,26 @@ class IntelliSearch:
         if openai_key:
             self.openai_client = openai.OpenAI(api_key=openai_key)
     
-    async def initialize_rag_system(self):
-        """Initialize the RAG system"""
-        if not RAG_AVAILABLE or not self.rag_system:
+    def initialize_rag_system(self):
+        """Attach the shared RAG system, initializing it if this is the first session"""
+        if not RAG_AVAILABLE:
             return False
             
         try:
-            success = await self.rag_system.initialize()
-            
-            if success:
-                self.rag_system.configure(
-                    similarity_threshold=self.similarity_threshold,
-                    enable_web_fallback=self.enable_web_fallback,
-                    max_local_results=self.max_results,
-                    max_web_results=self.max_results
-                )
-                
-                self.system_status = self.rag_system.get_system_status()
-                self.is_initialized = True
-                
-            return success
+            self.rag_system = get_rag_system(self.similarity_threshold, self.enable_web_fallback, self.max_results)
+            self.system_status = self.rag_system.get_system_status()
+            self.freeze_capabilities()
+            self.is_initialized = True
+            return True
         except Exception as e:
             print(f"RAG system initialization error: {e}")
             return False
     
+    def freeze_capabilities(self):
+        """Resolve the enabled capabilities once instead of rebuilding the list on every rerun"""
+        capabilities = self.system_status.get('capabilities', {})
+        self.active_capabilities = tuple(k.replace('_', ' ').title() for k, v in capabilities.items() if v)
+    
     async def call_ollama(self, prompt: str, model: str = "llama3.2:3b") -> str:
         """Execute Ollama model inference"""
         try:
@@ -481,7 +271,8 @@ class IntelliSearch:
                 payload = {
                     "model": model,
                     "prompt": prompt,
-                    "stream": False
+                    "stream": False,
+                    "keep_alive": "30m"  # Stay loaded between queries so the next one skips the model reload
                 }
                 async with session.post(f"{self.ollama_url}/api/generate", json=payload) as response:
                     if response.status == 200:
@@ -525,42 +316,13 @@ class IntelliSearch:
     
     def render_header(self):
         """Render space-themed header"""
-        st.markdown("""
-        <div class="main-header">
-            <div class="app-title">🚀 IntelliSearch</div>
-            <div class="app-subtitle">
-                Advanced Space Intelligence & Research System
-            </div>
-            <div class="header-description">
-                Explore the cosmos through AI-powered knowledge discovery
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(HEADER_HTML, unsafe_allow_html=True)
         
         # Add token metrics display
         if self.token_metrics['session_tokens'] > 0:
-            col1, col2, col3 = st.columns([1, 1, 1])
-            with col1:
-                st.markdown(f"""
-                <div style="background: rgba(15, 15, 35, 0.8); border: 1px solid rgba(100, 255, 218, 0.3); border-radius: 15px; padding: 1rem; text-align: center; backdrop-filter: blur(20px);">
-                    <span style="display: block; font-size: 1.5rem; font-weight: 700; color: #64ffda; margin-bottom: 0.5rem;">{self.token_metrics['query_tokens']}</span>
-                    <span style="display: block; font-size: 0.9rem; font-weight: 500; color: #cbd5e0; text-transform: uppercase; letter-spacing: 1px;">Query Tokens</span>
-                </div>
-                """, unsafe_allow_html=True)
-            with col2:
-                st.markdown(f"""
-                <div style="background: rgba(15, 15, 35, 0.8); border: 1px solid rgba(100, 255, 218, 0.3); border-radius: 15px; padding: 1rem; text-align: center; backdrop-filter: blur(20px);">
-                    <span style="display: block; font-size: 1.5rem; font-weight: 700; color: #64ffda; margin-bottom: 0.5rem;">{self.token_metrics['response_tokens']}</span>
-                    <span style="display: block; font-size: 0.9rem; font-weight: 500; color: #cbd5e0; text-transform: uppercase; letter-spacing: 1px;">Response Tokens</span>
-                </div>
-                """, unsafe_allow_html=True)
-            with col3:
-                st.markdown(f"""
-                <div style="background: rgba(15, 15, 35, 0.8); border: 1px solid rgba(100, 255, 218, 0.3); border-radius: 15px; padding: 1rem; text-align: center; backdrop-filter: blur(20px);">
-                    <span style="display: block; font-size: 1.5rem; font-weight: 700; color: #64ffda; margin-bottom: 0.5rem;">{self.token_metrics['session_tokens']}</span>
-                    <span style="display: block; font-size: 0.9rem; font-weight: 500; color: #cbd5e0; text-transform: uppercase; letter-spacing: 1px;">Session Total</span>
-                </div>
-                """, unsafe_allow_html=True)
+            for column, (key, label) in zip(st.columns([1, 1, 1]), TOKEN_METRICS):
+                with column:
+                    st.markdown(METRIC_CARD_TEMPLATE.format(value=self.token_metrics[key], label=label), unsafe_allow_html=True)
     
     def render_search_results(self, rag_result: Dict[str, Any]):
         """Render search results"""
@@ -576,25 +338,14 @@ class IntelliSearch:
         elif method == 'basic_response':
             st.info("💡 **Basic Response Mode** - Guidance provided")
         
-        # Display sources if available
+        # Display sources if available, as one element rather than one per source
         if sources:
             with st.expander(f"Sources ({len(sources)})", expanded=False):
-                for source in sources:
-                    if isinstance(source, dict):
-                        content = source.get('content', '')[:400]
-                        similarity = source.get('similarity', 0.0)
-                        st.markdown(f"""
-                        <div class="result-card">
-                            <div class="result-content">
-                                {content}{'...' if len(source.get('content', '')) > 400 else ''}
-                            </div>
-                            <div style="margin-top: 1rem; color: #64ffda; font-size: 0.9rem;">
-                                Similarity: {similarity:.1%}
-                            </div>
-                        </div>
-                        """, unsafe_allow_html=True)
+                st.markdown("".join(
+                    source_card_html(source) for source in sources if isinstance(source, dict)
+                ), unsafe_allow_html=True)
     
-    async def handle_basic_query(self, user_question: str):
+    def handle_basic_query(self, user_question: str):
         """Handle queries in basic mode when full RAG is unavailable"""
         st.info("🔍 Running in Basic Mode - Advanced RAG features unavailable")
         
@@ -622,10 +373,40 @@ class IntelliSearch:
         </div>
         """, unsafe_allow_html=True)
     
+    def is_filler_query(self, user_question: str) -> bool:
+        """True for input that isn't worth retrieval: greetings, too short, or no letters at all"""
+        normalized = user_question.strip().casefold().translate(FILLER_PUNCTUATION)
+        return len(normalized) < 3 or normalized in FILLER_QUERIES or not any(c.isalpha() for c in normalized)
+    
+    async def cached_query(self, user_question: str) -> Tuple[Dict[str, Any], bool]:
+        """Run the RAG pipeline, reusing a recent answer when the same question is searched again
+        
+        Returns the result and whether it came from the cache.
+        """
+        key = " ".join(user_question.split()).casefold()
+        entry = self.result_cache.get(key)
+        if entry and time.time() - entry[0] < RESULT_CACHE_TTL:
+            self.result_cache.move_to_end(key)
+            return entry[1], True
+        
+        rag_result = await self.rag_system.query(user_question)
+        # Only answers are cached, so a failed, empty or placeholder response is retried next time
+        response = rag_result.get('response')
+        if response and response.strip() not in LLM_FAILURE_RESPONSES:
+            self.result_cache[key] = (time.time(), rag_result)
+            self.result_cache.move_to_end(key)
+            if len(self.result_cache) > RESULT_CACHE_MAX_ENTRIES:
+                self.result_cache.popitem(last=False)
+        return rag_result, False
+    
     async def process_query(self, user_question: str):
         """Process user query"""
+        if self.is_filler_query(user_question):
+            self.display_response(FILLER_RESULT)
+            return
+        
         if not self.is_initialized:
-            await self.handle_basic_query(user_question)
+            self.handle_basic_query(user_question)
             return
         
         # Enhanced processing indicator
@@ -645,20 +426,23 @@ class IntelliSearch:
             start_time = time.time()
             
             # Execute RAG pipeline
-            rag_result = await self.rag_system.query(user_question)
+            rag_result, from_cache = await self.cached_query(user_question)
             
             # Update token metrics
             response_text = rag_result.get('response', '')
             self.update_token_metrics(user_question, response_text)
                 
-            # Update performance metrics
+            # Update performance metrics; a cache hit's stored query_time is not live latency, so it is left out
             end_time = time.time()
-            query_time = rag_result.get('query_time', end_time - start_time)
-            self.performance_metrics['total_queries'] += 1
-            self.performance_metrics['avg_response_time'] = (
-                (self.performance_metrics['avg_response_time'] * (self.performance_metrics['total_queries'] - 1) + query_time) /
-                self.performance_metrics['total_queries']
-            )
+            if from_cache:
+                query_time = end_time - start_time
+            else:
+                query_time = rag_result.get('query_time', end_time - start_time)
+                self.performance_metrics['total_queries'] += 1
+                self.performance_metrics['avg_response_time'] = (
+                    (self.performance_metrics['avg_response_time'] * (self.performance_metrics['total_queries'] - 1) + query_time) /
+                    self.performance_metrics['total_queries']
+                )
             
             
             # Add to query history
@@ -678,7 +462,7 @@ class IntelliSearch:
             
             # Generate and display response
             if rag_result.get('response'):
-                await self.display_response(rag_result)
+                self.display_response(rag_result)
             else:
                 st.warning("🔍 No response generated. Please try rephrasing your query or check if the topic is covered in our knowledge base.")
                 
@@ -700,7 +484,7 @@ class IntelliSearch:
             # Provide helpful suggestions
             st.info("💡 **Suggestions**: Try a simpler query, check your spelling, or wait a moment and try again.")
     
-    async def display_response(self, rag_result: Dict[str, Any]):
+    def display_response(self, rag_result: Dict[str, Any]):
         """Display response from RAG System"""
         response_text = rag_result.get('response', 'No response available')
         method = rag_result.get('method', 'unknown')
@@ -729,14 +513,17 @@ class IntelliSearch:
         </div>
         """, unsafe_allow_html=True)
     
-    async def run(self):
+    def run(self):
         """Main application interface"""
+        # Start (or join) the shared initialization first so it overlaps with rendering the header
+        if RAG_AVAILABLE and not self.is_initialized:
+            start_rag_system(self.similarity_threshold, self.enable_web_fallback, self.max_results)
         self.render_header()
         
         # System initialization
         if not self.is_initialized and RAG_AVAILABLE:
             with st.spinner("Initializing IntelliSearch System..."):
-                success = await self.initialize_rag_system()
+                success = self.initialize_rag_system()
                 
                 if not success:
                     st.warning("⚠️ Running in Basic Mode - Advanced RAG features unavailable")
@@ -748,8 +535,7 @@ class IntelliSearch:
         
         # System status - simplified without mode announcements
         if self.system_status:
-            capabilities = self.system_status.get('capabilities', {})
-            active_caps = [k.replace('_', ' ').title() for k, v in capabilities.items() if v]
+            active_caps = self.active_capabilities
             
             total_articles = "1100+"
             
@@ -801,54 +587,24 @@ class IntelliSearch:
             )
         
         # Help section with better button design
-        st.markdown("""
-        <div style="text-align: center; margin: 3rem 0 2rem 0;">
-            <details style="background: rgba(15, 15, 35, 0.8); border: 2px solid rgba(100, 255, 218, 0.3); border-radius: 20px; padding: 0; margin: 0 auto; max-width: 700px; backdrop-filter: blur(20px);">
-                <summary style="background: linear-gradient(135deg, rgba(100, 255, 218, 0.9) 0%, rgba(0, 255, 136, 0.8) 100%); color: #0f172a; padding: 1.5rem 2rem; border-radius: 18px; cursor: pointer; font-weight: 600; font-size: 1.2rem; text-align: center; transition: all 0.3s ease; user-select: none; list-style: none; display: flex; align-items: center; justify-content: center; gap: 0.75rem;">
-                    📚 How to Use IntelliSearch 
-                    <span style="font-size: 0.9rem; opacity: 0.8;">(Click to expand)</span>
-                </summary>
-                <div style="padding: 2.5rem; color: #f1f5f9; line-height: 1.7;">
-                    <h3 style="color: #00ff88; margin-bottom: 1rem; display: flex; align-items: center; gap: 0.5rem;">🚀 Getting Started</h3>
-                    <ul style="margin-bottom: 2rem; padding-left: 1.5rem;">
-                        <li style="margin-bottom: 0.75rem;"><strong style="color: #64ffda;">Ask Questions</strong>: Enter your query in the search box above</li>
-                        <li style="margin-bottom: 0.75rem;"><strong style="color: #64ffda;">Be Specific</strong>: More detailed questions get better answers</li>
-                        <li style="margin-bottom: 0.75rem;"><strong style="color: #64ffda;">Explore Topics</strong>: Try space, technology, recruitment, or scientific concepts</li>
-                    </ul>
-                    
-                    <h3 style="color: #00ff88; margin-bottom: 1rem; display: flex; align-items: center; gap: 0.5rem;">⚡ System Capabilities</h3>
-                    <ul style="margin-bottom: 2rem; padding-left: 1.5rem;">
-                        <li style="margin-bottom: 0.75rem;"><strong style="color: #64ffda;">Multi-Source Search</strong>: Searches both local knowledge bases and web sources</li>
-                        <li style="margin-bottom: 0.75rem;"><strong style="color: #64ffda;">Space Intelligence</strong>: Specialized in space exploration and astronomy</li>
-                        <li style="margin-bottom: 0.75rem;"><strong style="color: #64ffda;">Technical Analysis</strong>: Handles complex scientific and technical queries</li>
-                    </ul>
-                    
-                    <h3 style="color: #00ff88; margin-bottom: 1rem; display: flex; align-items: center; gap: 0.5rem;">💡 Tips for Best Results</h3>
-                    <ul style="padding-left: 1.5rem;">
-                        <li style="margin-bottom: 0.75rem;">Use natural language - ask as you would ask a human expert</li>
-                        <li style="margin-bottom: 0.75rem;">Include context when relevant (e.g., "for beginners" or "technical details")</li>
-                        <li style="margin-bottom: 0.75rem;">Ask follow-up questions to dive deeper into topics</li>
-                    </ul>
-                </div>
-            </details>
-        </div>
-        """, unsafe_allow_html=True)
+        st.html(HELP_HTML)
         
         # Process query
         if query_button and user_question:
-            await self.process_query(user_question)
+            # The query is the only async work, so an event loop is only created for it
+            asyncio.run(self.process_query(user_question))
 
-async def main():
+def main():
     """Application entry point"""
     if not st.session_state.get("intellisearch"):
         st.session_state["intellisearch"] = IntelliSearch()
     
     app = st.session_state["intellisearch"]
-    await app.run()
+    app.run()
 
 if __name__ == "__main__":
     try:
-        asyncio.run(main())
+        main()
     except Exception as e:
         st.error(f"Application error: {e}")
         st.info("Please check system requirements.")
\ No newline at end of file
@@ -6,23 +6,29 @@ Cost-optimized for recruiter showcase with gpt-4o-mini
 """
 
 import asyncio
+import importlib.util
 import aiohttp
 import numpy as np
 import json
 import time
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Tuple, AsyncIterator, Optional
 from dataclasses import dataclass
-import hashlib
 import pickle
 import os
+import re
+import math
+import uuid
+import multiprocessing
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 # Import dependencies with fallbacks
-try:
-    from sentence_transformers import SentenceTransformer
-    EMBEDDINGS_AVAILABLE = True
-except ImportError:
-    EMBEDDINGS_AVAILABLE = False
+# sentence-transformers pulls in torch, so only check that it is installed here
+# and import it when the model is actually loaded (keeps app start-up fast)
+EMBEDDINGS_AVAILABLE = importlib.util.find_spec("sentence_transformers") is not None
+if not EMBEDDINGS_AVAILABLE:
     print("⚠️ sentence-transformers not available")
 
 try:
@@ -32,6 +38,14 @@ except ImportError:
     FAISS_AVAILABLE = False
     print("⚠️ faiss not available")
 
+# Compiled scoring kernel used when FAISS is not installed
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    print("⚠️ numba not available")
+
 try:
     from web_search_manager import UniversalWebSearchManager
     WEB_SEARCH_AVAILABLE = True
@@ -47,7 +61,83 @@ except ImportError:
     OPENAI_AVAILABLE = False
     print("⚠️ openai not available")
 
-@dataclass
+# Greetings and thanks that never need retrieval or an LLM call
+TRIVIAL_QUERIES = frozenset({"hi", "hello", "hey", "thanks", "thank you", "ok", "okay"})
+# Punctuation dropped before matching, so "Hi!" and "thanks." hit the set in one translate pass
+TRIVIAL_PUNCTUATION = str.maketrans("", "", "!?.,")
+TRIVIAL_RESPONSE = "Hello! Ask me anything about space - planets, missions, black holes, or the latest discoveries."
+# Shared result for trivial queries; each hit only adds its own timing and query
+TRIVIAL_RESULT = {"response": TRIVIAL_RESPONSE, "sources": (), "method": "trivial", "confidence": 1.0}
+# Queries with no letters or digits at all (blank, punctuation, emoji)
+NON_WORD_QUERY = re.compile(r"^[\W_]*$")
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _inner_product_scores(query, codes, scales):
+        """Score every int8-quantized corpus row against the query in parallel (cosine similarity for unit vectors)"""
+        n, dimension = codes.shape
+        scores = np.empty(n, dtype=np.float32)
+        for i in prange(n):
+            acc = np.float32(0.0)
+            for j in range(dimension):
+                acc += codes[i, j] * query[j]
+            scores[i] = acc * scales[i]
+        return scores
+
+def quantize_embeddings(embeddings: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Quantize unit-length rows to int8 codes plus one float32 scale per row"""
+    scales = np.maximum(np.abs(embeddings).max(axis=1), 1e-12).astype(np.float32) / 127.0
+    codes = np.round(embeddings / scales[:, None]).astype(np.int8)
+    return np.ascontiguousarray(codes), scales
+
+def quantized_inner_products(query: np.ndarray, codes: np.ndarray, scales: np.ndarray) -> np.ndarray:
+    """Inner products of a float32 query with int8-quantized rows, via the Numba kernel when available"""
+    if NUMBA_AVAILABLE:
+        return _inner_product_scores(query, codes, scales)
+    return (codes @ query) * scales
+
+EMBEDDING_MODEL_NAME = 'all-MiniLM-L6-v2'
+EMBEDDING_POOL_BATCH_SIZE = 64
+# Each worker loads its own copy of the model, so the pool stays small regardless of core count
+EMBEDDING_POOL_MAX_WORKERS = 4
+
+# Embedding model, loaded once per process and shared by every SimpleRAGSystem (and by each pool worker)
+_embedding_model = None
+_embedding_model_lock = threading.Lock()
+
+def get_embedding_model():
+    """Return the process-wide sentence transformer, loading it on first use"""
+    global _embedding_model
+    with _embedding_model_lock:
+        if _embedding_model is None:
+            from sentence_transformers import SentenceTransformer
+            _embedding_model = SentenceTransformer(EMBEDDING_MODEL_NAME)
+        return _embedding_model
+
+def _init_embedding_worker():
+    """Pin each pool worker to one torch thread so the workers don't oversubscribe the cores"""
+    import torch
+    torch.set_num_threads(1)
+
+def _embed_batch(texts: List[str]) -> np.ndarray:
+    """Encode a batch of texts inside a pool worker"""
+    return get_embedding_model().encode(texts, convert_to_numpy=True)
+
+def normalize_embeddings(embeddings: np.ndarray):
+    """L2-normalize rows in place so inner product equals cosine similarity"""
+    if FAISS_AVAILABLE:
+        faiss.normalize_L2(embeddings)
+    else:
+        embeddings /= np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+
+class FallbackResponse(str):
+    """Response text that no model generated: an outage, timeout or error message, or a plain compilation of results
+    
+    It is still a str, so it is shown and streamed like any answer; the type lets search_query_stream mark
+    the result as degraded so neither cache keeps it.
+    """
+
+@dataclass(slots=True)
 class SearchResult:
     """Simple search result structure"""
     content: str
@@ -55,6 +145,139 @@ class SearchResult:
     source: str
     similarity: float
     source_type: str  # 'local' or 'web'
+    
+    def to_source(self, preview_chars: int = 200) -> Dict[str, Any]:
+        """Source dict for the UI; content shorter than the preview is passed through without copying"""
+        content = self.content if len(self.content) <= preview_chars else self.content[:preview_chars] + "..."
+        return {"title": self.title, "content": content, "source": self.source, "similarity": self.similarity, "source_type": self.source_type}
+
+class MicroBatcher:
+    """Coalesce concurrent embedding requests into a single encode call
+    
+    Requests arriving within max_wait_ms of the first one (up to max_batch) are
+    embedded together, so simultaneous sessions share one forward pass.
+    """
+    
+    def __init__(self, embed_fn, max_batch: int = 32, max_wait_ms: float = 20):
+        self.embed_fn = embed_fn  # Blocking callable: list of texts -> (n, dim) array
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.queue = None
+        self.worker = None
+        self.loop = None
+    
+    async def submit(self, text: str) -> np.ndarray:
+        """Queue a text and wait for its (1, dim) embedding"""
+        loop = asyncio.get_running_loop()
+        if self.worker is None or self.worker.done() or self.loop is not loop:
+            self.loop = loop
+            self.queue = asyncio.Queue()
+            self.worker = loop.create_task(self._run())
+        future = loop.create_future()
+        await self.queue.put((text, future))
+        return await future
+    
+    async def _run(self):
+        """Drain the queue in batches and resolve each caller's future"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            
+            texts = [text for text, _ in batch]
+            try:
+                # Encode off the event loop so other coroutines keep running
+                embeddings = await loop.run_in_executor(None, self.embed_fn, texts)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            
+            if len(batch) > 1:
+                print(f"🧮 Embedded {len(batch)} queries in one batch")
+            for i, (_, future) in enumerate(batch):
+                if not future.done():
+                    future.set_result(embeddings[i:i + 1])
+    
+    def close(self):
+        """Stop the background worker"""
+        if self.worker and not self.worker.done():
+            self.worker.cancel()
+        self.worker = None
+
+class SemanticCache:
+    """Reuse finished answers for paraphrased queries
+    
+    Queries are matched by cosine similarity of their normalized embeddings, so
+    "Mars rovers" and "rovers on Mars" share one entry. Keys are stored as int8
+    codes with a per-row scale, a quarter of the memory and bandwidth of float32.
+    Only touched from the event loop thread, so no locking is needed.
+    """
+    
+    def __init__(self, threshold: float = 0.95, max_entries: int = 1024, ttl: float = 600):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl  # Seconds an answer stays reusable (web-sourced answers go stale)
+        self.codes = None  # (n, dim) int8 codes of the L2-normalized query embeddings
+        self.scales = np.empty(0, dtype=np.float32)  # Dequantization scale per row
+        self.values: List[Dict[str, Any]] = []
+        self.last_used = np.empty(0, dtype=np.int64)  # Logical clock per row, for LRU eviction
+        self.expires = np.empty(0, dtype=np.float64)  # time.monotonic() deadline per row
+        self.clock = 0
+        self.hits = 0
+        self.misses = 0
+    
+    def lookup(self, query_embedding: np.ndarray) -> Optional[Dict[str, Any]]:
+        """Return the cached result for a near-identical earlier query, or None"""
+        if not self.values:
+            self.misses += 1
+            return None
+        similarities = quantized_inner_products(query_embedding[0].astype(np.float32), self.codes, self.scales)
+        similarities[self.expires < time.monotonic()] = -np.inf
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.threshold:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.clock += 1
+        self.last_used[best] = self.clock
+        return self.values[best]
+    
+    def add(self, query_embedding: np.ndarray, value: Dict[str, Any]):
+        """Cache a result, replacing the least recently used entry once full"""
+        self.clock += 1
+        expires = time.monotonic() + self.ttl
+        code, scale = quantize_embeddings(query_embedding.astype(np.float32))
+        if len(self.values) < self.max_entries:
+            self.codes = code if self.codes is None else np.vstack([self.codes, code])
+            self.scales = np.append(self.scales, scale)
+            self.values.append(value)
+            self.last_used = np.append(self.last_used, self.clock)
+            self.expires = np.append(self.expires, expires)
+        else:
+            slot = int(np.argmin(self.last_used))
+            self.codes[slot] = code[0]
+            self.scales[slot] = scale[0]
+            self.values[slot] = value
+            self.last_used[slot] = self.clock
+            self.expires[slot] = expires
+    
+    def clear(self):
+        """Drop every entry"""
+        self.codes = None
+        self.scales = np.empty(0, dtype=np.float32)
+        self.values = []
+        self.last_used = np.empty(0, dtype=np.int64)
+        self.expires = np.empty(0, dtype=np.float64)
 
 class SimpleRAGSystem:
     """Clean, simple RAG system implementation"""
@@ -65,8 +288,17 @@ class SimpleRAGSystem:
         # Core components
         self.embedding_model = None
         self.faiss_index = None
+        # Numba backend when FAISS is missing: int8 corpus codes with per-row scales (a quarter of float32 memory)
+        self.document_embeddings = None
+        self.embedding_scales = None
         self.documents = []
+        # Per-document metadata as parallel lists indexed by row, so search avoids dict lookups
+        self.document_titles = []
+        self.document_sources = []
         self.document_metadata = []
+        # Corpus statistics for the system info panel, computed once per document set
+        self.document_content_lengths = np.zeros(0, dtype=np.int64)
+        self.document_categories = []
         
         # Web search manager
         self.web_search_manager = None
@@ -79,11 +311,12 @@ class SimpleRAGSystem:
         self.openai_model = self._get_env_or_secret('OPENAI_MODEL', 'gpt-4o-mini')  # Cheapest model (~$0.001/query)
         self.max_tokens = int(self._get_env_or_secret('OPENAI_MAX_TOKENS', '150'))  # Cost control
         self.openai_available = False
+        self.llm_timeout = 30  # Seconds before an OpenAI call gives up and the Qwen/simple fallbacks take over
         
         # Initialize OpenAI client if API key is available
         if OPENAI_AVAILABLE and self.openai_api_key:
             try:
-                self.openai_client = AsyncOpenAI(api_key=self.openai_api_key)
+                self.openai_client = AsyncOpenAI(api_key=self.openai_api_key, timeout=self.llm_timeout, max_retries=1)
                 self.openai_available = True
                 print(f"✅ OpenAI initialized with model: {self.openai_model}")
             except Exception as e:
@@ -91,19 +324,58 @@ class SimpleRAGSystem:
         elif not self.openai_api_key:
             print("⚠️ OpenAI API key not found in environment variables")
         
+        # Pooled HTTP session, created lazily on the event loop that first uses it
+        self.http_session = None
+        self.http_session_loop = None
+        
         # Qwen-first Ollama configuration (primary AI model)
         self.ollama_url = "http://localhost:11434"
         self.ollama_model = "qwen2.5:0.5b"  # Primary Qwen model - lightweight and fast
+        # Keep the model (and its prompt KV cache) resident between queries instead of Ollama's 5 minute default,
+        # so idle gaps don't cost a reload and a full re-prefill of the shared instruction prefix
+        self.ollama_keep_alive = "30m"
         
         # Search configuration - optimized for cloud deployment
         self.similarity_threshold = 0.4  # Higher threshold for quality results
         self.max_local_results = 5  # More local results (was 3)
         self.max_web_results = 3  # Fewer web results to reduce latency (was 5)
+        self.speculative_web_search = True  # Start web search alongside local retrieval, cancel on strong local hit
+        self.web_search_timeout = 8  # Seconds before a hung web search is abandoned (falls through to FLOW 3)
+        self.max_concurrent_queries = 8  # Queries past this many wait their turn instead of piling onto the LLM
+        self.progress_interval = 10  # Seconds between progress events while a query is queued or a model is generating
+        # Corpus size at which the flat index is replaced by IVF-PQ: below it an exact scan takes about a millisecond,
+        # and IVF needs ~39 training rows per list anyway
+        self.ivf_index_threshold = 10000
+        self.ivf_nprobe = 16  # IVF lists scanned per query - higher is more accurate but slower
+        
+        # get_system_info scans every document, so status polls reuse a recent snapshot
+        self.system_info_ttl = 5.0  # Seconds a snapshot stays valid
+        self.system_info_cache = None  # (monotonic timestamp, info dict); cleared when documents or models change
+        self.parallel_embedding_threshold = 2000  # Corpus size at which index builds fan out to a process pool
+        
+        # Concurrent queries from different sessions share one embedding forward pass
+        self.query_semaphore = None  # Created on the event loop that first runs a query
+        self.query_semaphore_loop = None
+        self.embedding_batcher = MicroBatcher(
+            lambda texts: self.embedding_model.encode(texts, convert_to_numpy=True),
+            max_batch=32,
+            max_wait_ms=20
+        )
+        # Paraphrases of an answered question skip retrieval and generation
+        self.semantic_cache = SemanticCache(threshold=0.95, max_entries=1024)
+        # Exact repeats (example buttons, resubmits) skip the encoder; LRU keyed on the normalized query
+        self.query_embedding_cache = OrderedDict()
+        self.query_embedding_cache_size = 512
+        self.query_embedding_cache_hits = 0
+        self.query_embedding_cache_misses = 0
+        self.corpus_version = uuid.uuid4().hex  # Changes whenever the indexed documents do; part of every cache key
         
         # Storage paths
         self.storage_dir = Path("storage/simple_rag")
         self.storage_dir.mkdir(parents=True, exist_ok=True)
         self.faiss_path = self.storage_dir / "faiss_index.bin"
+        self.embeddings_path = self.storage_dir / "embeddings.npy"
+        self.embedding_scales_path = self.storage_dir / "embedding_scales.npy"
         self.metadata_path = self.storage_dir / "metadata.pkl"
         self.documents_path = self.storage_dir / "documents.pkl"
         
@@ -127,21 +399,35 @@ class SimpleRAGSystem:
         return default
     
     def _get_openai_api_key(self) -> str:
-        """Get OpenAI API key from environment or Streamlit secrets"""
-        # Try environment variable first (.env file)
-        api_key = os.getenv('OPENAI_API_KEY')
-        if api_key:
-            return api_key
-        
-        # Try Streamlit secrets for cloud deployment
-        try:
-            import streamlit as st
-            if hasattr(st, 'secrets') and 'OPENAI_API_KEY' in st.secrets:
-                return st.secrets['OPENAI_API_KEY']
-        except (ImportError, AttributeError, KeyError):
-            pass
-        
-        return None
+        """Get OpenAI API key from environment (.env file) or Streamlit secrets for cloud deployment"""
+        return self._get_env_or_secret('OPENAI_API_KEY')
+    
+    async def _get_http_session(self) -> aiohttp.ClientSession:
+        """Return the pooled HTTP session so keep-alive connections are reused across queries"""
+        loop = asyncio.get_running_loop()
+        if self.http_session is None or self.http_session.closed or self.http_session_loop is not loop:
+            # Keep-alive connections (and cached DNS) are reused across queries to Ollama and the web
+            self.http_session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(
+                limit=64, limit_per_host=16, ttl_dns_cache=300, keepalive_timeout=60
+            ))
+            self.http_session_loop = loop
+        return self.http_session
+    
+    def _get_query_semaphore(self) -> asyncio.Semaphore:
+        """Return the semaphore bounding in-flight queries on the running loop"""
+        loop = asyncio.get_running_loop()
+        if self.query_semaphore is None or self.query_semaphore_loop is not loop:
+            self.query_semaphore = asyncio.Semaphore(self.max_concurrent_queries)
+            self.query_semaphore_loop = loop
+        return self.query_semaphore
+    
+    async def close(self):
+        """Close the pooled HTTP session and stop the embedding batcher"""
+        self.embedding_batcher.close()
+        if self.http_session and not self.http_session.closed:
+            await self.http_session.close()
+        self.http_session = None
+        self.http_session_loop = None
     
     async def initialize(self) -> bool:
         """Initialize all components with graceful degradation"""
@@ -192,6 +478,7 @@ class SimpleRAGSystem:
             
             # System is functional if at least embedding model works
             if success_count >= 1:
+                await self._warm_up()
                 print(f"✅ RAG System initialized ({success_count}/{total_components} components active)")
                 return True
             else:
@@ -202,6 +489,23 @@ class SimpleRAGSystem:
             print(f"❌ Initialization failed: {e}")
             return False
     
+    async def _warm_up(self):
+        """Run one throwaway query through the hot path so the first real user doesn't pay one-off costs
+        
+        The first encode allocates the model's buffers, the first Numba scoring call JIT-compiles the
+        kernel, and the first FAISS search pages in a memory-mapped index.
+        """
+        try:
+            if self.embedding_model:
+                query_embedding = await self.embedding_batcher.submit("warm up")
+                normalize_embeddings(query_embedding)
+                if self.faiss_index is not None or self.document_embeddings is not None:
+                    self._score_local(query_embedding, 1)
+            await self._get_http_session()
+            print("🔥 Query path warmed up")
+        except Exception as e:
+            print(f"⚠️ Warm-up skipped: {e}")
+    
     async def _init_embedding_model(self) -> bool:
         """Initialize sentence transformer model"""
         if not EMBEDDINGS_AVAILABLE:
@@ -210,7 +514,8 @@ class SimpleRAGSystem:
         
         try:
             print("📦 Loading sentence transformer model...")
-            self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+            self.embedding_model = get_embedding_model()
+            self.system_info_cache = None
             print("✅ Embedding model loaded")
             return True
         except Exception as e:
@@ -219,21 +524,35 @@ class SimpleRAGSystem:
     
     async def _init_document_index(self) -> bool:
         """Load existing index or create new one"""
-        if not FAISS_AVAILABLE or not self.embedding_model:
+        if not (FAISS_AVAILABLE or NUMBA_AVAILABLE) or not self.embedding_model:
             print("❌ Cannot initialize FAISS index - requirements not met")
             return False
         
         try:
             # Try to load existing index
-            if self.faiss_path.exists() and self.metadata_path.exists() and self.documents_path.exists():
-                print("🔄 Loading existing FAISS index...")
-                self.faiss_index = faiss.read_index(str(self.faiss_path))
+            index_path = self.faiss_path if FAISS_AVAILABLE else self.embeddings_path
+            if index_path.exists() and self.metadata_path.exists() and self.documents_path.exists():
+                if FAISS_AVAILABLE:
+                    print("🔄 Loading existing FAISS index...")
+                    try:
+                        # Memory-map so large indexes load without reading every vector up front
+                        self.faiss_index = faiss.read_index(str(self.faiss_path), faiss.IO_FLAG_MMAP)
+                    except RuntimeError:
+                        self.faiss_index = faiss.read_index(str(self.faiss_path))
+                    ivf_index = faiss.try_extract_index_ivf(self.faiss_index)
+                    if ivf_index is not None:
+                        ivf_index.nprobe = self.ivf_nprobe
+                else:
+                    print("🔄 Loading existing embeddings for Numba search...")
+                    self.document_embeddings = np.load(self.embeddings_path)
+                    self.embedding_scales = np.load(self.embedding_scales_path)
                 
                 with open(self.metadata_path, 'rb') as f:
                     self.document_metadata = pickle.load(f)
                 
                 with open(self.documents_path, 'rb') as f:
                     self.documents = pickle.load(f)
+                self._build_metadata_arrays()
                 
                 print(f"✅ Loaded {len(self.documents)} documents from existing index")
                 return True
@@ -550,34 +869,51 @@ class SimpleRAGSystem:
         
         print(f"🔄 Creating embeddings for {len(documents)} documents...")
         
-        # Progress tracking for large datasets
-        batch_size = 100 if len(documents) > 500 else len(documents)
-        all_embeddings = []
-        
-        for i in range(0, len(documents), batch_size):
-            batch = documents[i:i + batch_size]
-            batch_texts = [doc["content"] for doc in batch]
+        if EMBEDDINGS_AVAILABLE and len(documents) >= self.parallel_embedding_threshold:
+            # Large corpora: encode batches in worker processes so the forward passes escape the GIL
+            texts = [doc["content"] for doc in documents]
+            batches = [texts[i:i + EMBEDDING_POOL_BATCH_SIZE] for i in range(0, len(texts), EMBEDDING_POOL_BATCH_SIZE)]
+            workers = min(EMBEDDING_POOL_MAX_WORKERS, os.cpu_count() or 1, len(batches))
+            print(f"   Encoding {len(batches)} batches across {workers} worker processes")
+            loop = asyncio.get_running_loop()
+            # Scoped to this build so the workers and their model copies exit with it;
+            # spawn avoids forking a parent that already has torch threads running
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                     initializer=_init_embedding_worker) as pool:
+                all_embeddings = await asyncio.gather(*[loop.run_in_executor(pool, _embed_batch, batch) for batch in batches])
+        else:
+            # Progress tracking for large datasets
+            batch_size = 100 if len(documents) > 500 else len(documents)
+            all_embeddings = []
             
-            print(f"   Processing batch {i//batch_size + 1}/{(len(documents) + batch_size - 1)//batch_size} ({len(batch)} documents)")
-            batch_embeddings = self.embedding_model.encode(batch_texts, convert_to_numpy=True)
-            all_embeddings.append(batch_embeddings)
+            for i in range(0, len(documents), batch_size):
+                batch = documents[i:i + batch_size]
+                batch_texts = [doc["content"] for doc in batch]
+                
+                print(f"   Processing batch {i//batch_size + 1}/{(len(documents) + batch_size - 1)//batch_size} ({len(batch)} documents)")
+                batch_embeddings = self.embedding_model.encode(batch_texts, convert_to_numpy=True)
+                all_embeddings.append(batch_embeddings)
         
         # Combine all embeddings
         embeddings = np.vstack(all_embeddings)
         print(f"✅ Created embeddings for {len(documents)} documents")
         
-        # Create FAISS index
-        print("🔧 Building FAISS index...")
-        dimension = embeddings.shape[1]
-        self.faiss_index = faiss.IndexFlatIP(dimension)  # Inner product for similarity
-        
         # Normalize embeddings for cosine similarity
-        faiss.normalize_L2(embeddings)
-        self.faiss_index.add(embeddings)
+        normalize_embeddings(embeddings)
+        
+        if FAISS_AVAILABLE:
+            # Create FAISS index
+            print("🔧 Building FAISS index...")
+            self.faiss_index = self._build_faiss_index(embeddings)
+        else:
+            # Without FAISS, keep a quantized contiguous matrix for the compiled Numba kernel
+            print("🔧 FAISS unavailable, using Numba similarity search...")
+            self.document_embeddings, self.embedding_scales = quantize_embeddings(embeddings)
         
         # Store documents and metadata
         self.documents = documents
         self.document_metadata = [{"id": i, **doc} for i, doc in enumerate(documents)]
+        self._build_metadata_arrays()
         
         # Save to disk (may fail in read-only environments)
         await self._save_index()
@@ -596,13 +932,54 @@ class SimpleRAGSystem:
             import gc
             gc.collect()
     
+    def _build_faiss_index(self, embeddings: np.ndarray):
+        """Build a flat index for small corpora, IVF-PQ with SQ8 re-ranking for large ones"""
+        count, dimension = embeddings.shape
+        if count < self.ivf_index_threshold:
+            index = faiss.IndexFlatIP(dimension)  # Inner product for similarity
+            index.add(embeddings)
+            return index
+        
+        # IVF-PQ only scans ~nprobe of sqrt(N)-sized lists per query and stores 8-bit codes; the refine
+        # layer re-scores the shortlist from 8-bit scalar-quantized vectors, close enough to exact that
+        # similarity_threshold keeps its meaning. Per vector that is 16 + 384 bytes for 384-d embeddings,
+        # about a quarter of the 1536 bytes a flat index (or an IndexRefineFlat) keeps as float32
+        nlist = min(int(4 * math.sqrt(count)), count // 39)  # FAISS wants ~39 training points per list
+        subquantizers = 16 if dimension % 16 == 0 else 8
+        print(f"🔧 Training IVF-PQ index ({nlist} lists, {subquantizers} subquantizers)...")
+        ivf_index = faiss.IndexIVFPQ(faiss.IndexFlatIP(dimension), dimension, nlist, subquantizers, 8, faiss.METRIC_INNER_PRODUCT)
+        refine_index = faiss.IndexScalarQuantizer(dimension, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT)
+        index = faiss.IndexRefine(ivf_index, refine_index)
+        index.k_factor = 4
+        index.train(embeddings)
+        index.add(embeddings)
+        ivf_index.nprobe = self.ivf_nprobe
+        return index
+    
+    def _build_metadata_arrays(self):
+        """Split document titles and sources into parallel lists indexed like the embeddings"""
+        self.system_info_cache = None  # Document set changed
+        # New corpus: cached answers may cite documents that no longer exist, so start over
+        self.corpus_version = uuid.uuid4().hex
+        self.semantic_cache.clear()
+        self.document_titles = [doc["title"] for doc in self.documents]
+        self.document_sources = [doc.get('url', f"Local Knowledge Base - {doc['category']}") for doc in self.documents]
+        self.document_content_lengths = np.fromiter(
+            (len(doc.get("content", "")) for doc in self.documents), dtype=np.int64, count=len(self.documents)
+        )
+        self.document_categories = list({doc.get("category", "unknown") for doc in self.documents})
+    
     async def _save_index(self):
         """Save FAISS index and metadata to disk"""
         try:
             # Check if we can actually save (may not be possible in some cloud environments)
             self.storage_dir.mkdir(parents=True, exist_ok=True)
             
-            faiss.write_index(self.faiss_index, str(self.faiss_path))
+            if self.faiss_index is not None:
+                faiss.write_index(self.faiss_index, str(self.faiss_path))
+            else:
+                np.save(self.embeddings_path, self.document_embeddings)
+                np.save(self.embedding_scales_path, self.embedding_scales)
             
             with open(self.metadata_path, 'wb') as f:
                 pickle.dump(self.document_metadata, f)
@@ -617,12 +994,37 @@ class SimpleRAGSystem:
     
     def get_system_info(self) -> Dict[str, Any]:
         """Get comprehensive system information for debugging and status display"""
-        # Calculate document statistics
-        categories = list(set([doc.get("category", "unknown") for doc in self.documents]))
+        now = time.monotonic()
+        if self.system_info_cache and now - self.system_info_cache[0] < self.system_info_ttl:
+            return self.system_info_cache[1]
         
-        # Content statistics
-        total_content_length = sum(len(doc.get("content", "")) for doc in self.documents)
-        avg_content_length = total_content_length / len(self.documents) if self.documents else 0
+        info = self._compute_system_info()
+        self.system_info_cache = (now, info)
+        return info
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Sizes and hit counts of the per-query caches, for tuning their limits"""
+        return {
+            "semantic_cache": {
+                "entries": len(self.semantic_cache.values),
+                "max_entries": self.semantic_cache.max_entries,
+                "hits": self.semantic_cache.hits,
+                "misses": self.semantic_cache.misses,
+            },
+            "query_embedding_cache": {
+                "entries": len(self.query_embedding_cache),
+                "max_entries": self.query_embedding_cache_size,
+                "hits": self.query_embedding_cache_hits,
+                "misses": self.query_embedding_cache_misses,
+            },
+        }
+    
+    def _compute_system_info(self) -> Dict[str, Any]:
+        """Build the system information snapshot"""
+        # Document and content statistics, precomputed when the document set was loaded
+        categories = self.document_categories
+        total_content_length = int(self.document_content_lengths.sum())
+        avg_content_length = self.document_content_lengths.mean() if self.document_content_lengths.size else 0
         
         # Determine data source
         data_source = "Unknown"
@@ -682,25 +1084,25 @@ class SimpleRAGSystem:
     async def _test_ollama(self) -> bool:
         """Test Ollama connection and available models"""
         try:
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=5)) as session:
-                # Test connection
-                async with session.get(f"{self.ollama_url}/api/tags") as response:
-                    if response.status != 200:
-                        return False
+            session = await self._get_http_session()
+            # Test connection
+            async with session.get(f"{self.ollama_url}/api/tags", timeout=aiohttp.ClientTimeout(total=5)) as response:
+                if response.status != 200:
+                    return False
                     
-                    models_data = await response.json()
-                    available_models = [model['name'] for model in models_data.get('models', [])]
-                    print(f"🤖 Available Ollama models: {', '.join(available_models)}")
+                models_data = await response.json()
+                available_models = [model['name'] for model in models_data.get('models', [])]
+                print(f"🤖 Available Ollama models: {', '.join(available_models)}")
                     
-                    # Choose best available model (prioritize Qwen models for performance)
-                    preferred_models = ["qwen2.5:0.5b", "qwen2.5:1.5b", "qwen2.5:3b", "llama3.2:1b", "llama3.2:3b"]
-                    for model in preferred_models:
-                        if model in available_models:
-                            self.ollama_model = model
-                            break
+                # Choose best available model (prioritize Qwen models for performance)
+                preferred_models = ["qwen2.5:0.5b", "qwen2.5:1.5b", "qwen2.5:3b", "llama3.2:1b", "llama3.2:3b"]
+                for model in preferred_models:
+                    if model in available_models:
+                        self.ollama_model = model
+                        break
                     
-                    print(f"✅ Using Ollama model: {self.ollama_model}")
-                    return True
+                print(f"✅ Using Ollama model: {self.ollama_model}")
+                return True
                     
         except Exception as e:
             print(f"⚠️ Ollama test failed: {e}")
@@ -708,14 +1110,45 @@ class SimpleRAGSystem:
     
     async def search_query(self, query: str) -> Dict[str, Any]:
         """Main search function - the core of the RAG system"""
+        result = None
+        async for event in self.search_query_stream(query):
+            if event["type"] == "done":
+                result = event["result"]
+        return result
+    
+    async def search_query_stream(self, query: str) -> AsyncIterator[Dict[str, Any]]:
+        """Run a search, yielding sources, response tokens and finally the complete result
+        
+        Events are dicts: {"type": "sources", "sources": [...], "method": ...},
+        {"type": "token", "text": ...} and {"type": "done", "result": {...}}. While the query is queued
+        or a model is generating, {"type": "progress", "stage": ...} arrives every progress_interval seconds.
+        """
         print(f"\n🔍 Processing query: '{query[:50]}...'")
         start_time = time.time()
+        web_task = None
         
+        # Fast path: greetings and empty input skip retrieval and generation entirely
+        normalized = query.strip().lower().translate(TRIVIAL_PUNCTUATION)
+        if normalized in TRIVIAL_QUERIES or NON_WORD_QUERY.match(normalized):
+            yield {"type": "done", "result": {**TRIVIAL_RESULT, "processing_time": time.time() - start_time, "query": query}}
+            return
+        
+        # Backpressure: beyond max_concurrent_queries, new queries queue here rather than all
+        # contending for the embedder, web search and LLM at once
+        semaphore = self._get_query_semaphore()
+        while True:
+            try:
+                await asyncio.wait_for(semaphore.acquire(), self.progress_interval)
+                break
+            except asyncio.TimeoutError:
+                # Still queued: tell the consumer the search is alive so it doesn't give up on it
+                yield {"type": "progress", "stage": "queued"}
         try:
             # Debug: Check system state
             print(f"🔧 DEBUG - System State:")
             print(f"   Embedding model available: {self.embedding_model is not None}")
             print(f"   FAISS index available: {self.faiss_index is not None}")
+            print(f"   Numba embeddings available: {self.document_embeddings is not None}")
             print(f"   Documents loaded: {len(self.documents) if self.documents else 0}")
             print(f"   Web search available: {self.web_search_manager is not None}")
             print(f"   Similarity threshold: {self.similarity_threshold}")
@@ -726,22 +1159,39 @@ class SimpleRAGSystem:
                 web_results = await self._search_web(query)
                 print(f"🌐 DEBUG - Web search returned {len(web_results) if web_results else 0} results")
                 if web_results:
+                    sources = [r.to_source() for r in web_results]
+                    yield {"type": "sources", "sources": sources, "method": "web_search_only"}
                     response = await self._generate_simple_response(query, web_results)
-                    return {
+                    yield {"type": "token", "text": response}
+                    yield {"type": "done", "result": {
                         "response": response,
-                        "sources": [{"title": r.title, "content": r.content[:200] + "...", "source": r.source, "similarity": r.similarity, "source_type": r.source_type} for r in web_results],
+                        "sources": sources,
                         "method": "web_search_only",
                         "processing_time": time.time() - start_time,
-                        "query": query
-                    }
+                        "query": query,
+                        "degraded": True
+                    }}
                 else:
-                    return self._error_response("Neither embedding model nor web search available")
+                    yield {"type": "done", "result": self._error_response("Neither embedding model nor web search available")}
+                return
             
             print("🧠 Generating query embedding...")
-            query_embedding = self.embedding_model.encode([query], convert_to_numpy=True)
-            faiss.normalize_L2(query_embedding)
+            # Batched and encoded off the event loop, so other queries make progress meanwhile
+            query_embedding = await self._embed_query(query)
             print(f"✅ Query embedding shape: {query_embedding.shape}")
             
+            cached = self.semantic_cache.lookup(query_embedding)
+            if cached:
+                print("♻️ Semantic cache hit - reusing the answer to a near-identical query")
+                yield {"type": "sources", "sources": cached["sources"], "method": cached["method"]}
+                yield {"type": "token", "text": cached["response"]}
+                yield {"type": "done", "result": {**cached, "processing_time": time.time() - start_time, "query": query}}
+                return
+            
+            # Cache missed: speculatively start web search so FLOW 2 overlaps with local retrieval instead of following it
+            if self.speculative_web_search and self.web_search_manager:
+                web_task = asyncio.create_task(self._search_web(query))
+            
             # Step 2: Search local FAISS index
             print("📚 Searching local space documents...")
             local_results = await self._search_local(query_embedding, query)
@@ -758,11 +1208,13 @@ class SimpleRAGSystem:
                 print(f"🔄 FLOW 1: Local content found (similarity: {local_results[0].similarity:.3f}) → Qwen processing")
                 search_results = local_results[:self.max_local_results]
                 search_method = "qwen_local_content"
+                if web_task:
+                    web_task.cancel()  # Local content is good enough, drop the speculative web search
             else:
                 # FLOW 2: No good local content → Try DuckDuckGo → Qwen with web content
                 best_similarity = local_results[0].similarity if local_results else 0.0
                 print(f"🔄 FLOW 2: No local content (similarity: {best_similarity:.3f}) → DuckDuckGo → Qwen processing")
-                web_results = await self._search_web(query)
+                web_results = await web_task if web_task else await self._search_web(query)
                 print(f"🌐 DEBUG - Web search returned {len(web_results) if web_results else 0} results")
                 
                 if web_results:
@@ -777,53 +1229,106 @@ class SimpleRAGSystem:
             print(f"📋 DEBUG - Final search results: {len(search_results) if search_results else 0}")
             print(f"🎯 DEBUG - Selected method: {search_method}")
             
+            sources = [r.to_source() for r in search_results]
+            yield {"type": "sources", "sources": sources, "method": search_method}
+            
             # Step 4: Generate response with Qwen-first approach
-            # All three flows are handled by _generate_smart_response which prioritizes Qwen
-            response = await self._generate_smart_response(query, search_results)
+            # All three flows are handled by _stream_smart_response, which streams tokens when the model supports it
+            chunks = []
+            async for chunk in self._relay_with_progress(self._stream_smart_response(query, search_results), "generating"):
+                if isinstance(chunk, dict):
+                    yield chunk
+                    continue
+                chunks.append(chunk)
+                yield {"type": "token", "text": chunk}
+            response = "".join(chunks)
+            # Outage messages and the plain-text compilation are answered again next time, not cached
+            degraded = any(isinstance(chunk, FallbackResponse) for chunk in chunks)
             
             processing_time = time.time() - start_time
             print(f"⚡ Query processed in {processing_time:.2f}s")
             
-            return {
+            result = {
                 "response": response,
-                "sources": [{"title": r.title, "content": r.content[:200] + "...", "source": r.source, "similarity": r.similarity, "source_type": r.source_type} for r in search_results],
+                "sources": sources,
                 "method": search_method,
                 "processing_time": processing_time,
-                "query": query
+                "query": query,
+                "degraded": degraded
             }
+            if not degraded:
+                self.semantic_cache.add(query_embedding, result)
+            yield {"type": "done", "result": result}
             
         except Exception as e:
             print(f"❌ Query processing failed: {e}")
-            return self._error_response(f"Query processing failed: {str(e)}")
+            yield {"type": "done", "result": self._error_response(f"Query processing failed: {str(e)}")}
+        finally:
+            semaphore.release()
+            # Also covers consumers that stop iterating early
+            if web_task and not web_task.done():
+                web_task.cancel()
+    
+    async def _embed_query(self, query: str) -> np.ndarray:
+        """Normalized (1, dim) embedding of a query, served from the LRU cache when it was seen recently"""
+        key = " ".join(query.split()).casefold()
+        cached = self.query_embedding_cache.get(key)
+        if cached is not None:
+            self.query_embedding_cache.move_to_end(key)
+            self.query_embedding_cache_hits += 1
+            return cached
+        
+        self.query_embedding_cache_misses += 1
+        query_embedding = await self.embedding_batcher.submit(query)
+        normalize_embeddings(query_embedding)
+        self.query_embedding_cache[key] = query_embedding
+        if len(self.query_embedding_cache) > self.query_embedding_cache_size:
+            self.query_embedding_cache.popitem(last=False)
+        return query_embedding
     
     async def _search_local(self, query_embedding: np.ndarray, query: str) -> List[SearchResult]:
         """Search local FAISS index"""
-        if not self.faiss_index or len(self.documents) == 0:
+        if (self.faiss_index is None and self.document_embeddings is None) or len(self.documents) == 0:
             print("⚠️ No local documents available")
             return []
         
         try:
-            # Search FAISS index
-            similarities, indices = self.faiss_index.search(query_embedding, min(self.max_local_results * 2, len(self.documents)))
+            similarities, indices = self._score_local(query_embedding, min(self.max_local_results * 2, len(self.documents)))
             
-            results = []
-            for sim, idx in zip(similarities[0], indices[0]):
-                if idx < len(self.documents):
-                    doc = self.documents[idx]
-                    results.append(SearchResult(
-                        content=doc["content"],
-                        title=doc["title"],
-                        source=doc.get('url', f"Local Knowledge Base - {doc['category']}"),
-                        similarity=float(sim),
-                        source_type="local"
-                    ))
-            
-            return results
+            # One boolean mask drops FAISS's -1 padding and any out-of-range rows, then
+            # tolist() converts the survivors to Python scalars in a single pass
+            valid = (indices >= 0) & (indices < len(self.documents))
+            return [
+                SearchResult(
+                    content=self.documents[idx]["content"],
+                    title=self.document_titles[idx],
+                    source=self.document_sources[idx],
+                    similarity=sim,
+                    source_type="local"
+                )
+                for sim, idx in zip(similarities[valid].tolist(), indices[valid].tolist())
+            ]
             
         except Exception as e:
             print(f"⚠️ Local search failed: {e}")
             return []
     
+    def _score_local(self, query_embedding: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (similarities, indices) of the k best documents for a normalized query embedding"""
+        if self.faiss_index is not None:
+            similarities, indices = self.faiss_index.search(query_embedding, k)
+            return similarities[0], indices[0]
+        
+        # Quantized backend: inner products over the whole corpus (Numba kernel when available), then pick the top k
+        scores = quantized_inner_products(query_embedding[0], self.document_embeddings, self.embedding_scales)
+        # argpartition finds the top k in O(N); only those k are then sorted
+        if k < len(scores):
+            indices = np.argpartition(-scores, k)[:k]
+            indices = indices[np.argsort(-scores[indices])]
+        else:
+            indices = np.argsort(-scores)
+        return scores[indices], indices
+    
     async def _search_web(self, query: str) -> List[SearchResult]:
         """Search web using DuckDuckGo with comprehensive debugging"""
         print(f"🌐 DEBUG - Starting web search for: '{query}'")
@@ -839,7 +1344,10 @@ class SimpleRAGSystem:
         
         try:
             print(f"🔍 DEBUG - Calling web_search_manager.search()...")
-            web_results = await self.web_search_manager.search(query, max_results=self.max_web_results)
+            web_results = await asyncio.wait_for(
+                self.web_search_manager.search(query, max_results=self.max_web_results),
+                timeout=self.web_search_timeout
+            )
             
             print(f"📊 DEBUG - Raw web search returned: {len(web_results) if web_results else 0} results")
             if web_results:
@@ -849,11 +1357,9 @@ class SimpleRAGSystem:
             results = []
             for i, result in enumerate(web_results):
                 # Extract content from web SearchResult object
-                content = result.content if hasattr(result, 'content') and result.content else (
-                    result.snippet if hasattr(result, 'snippet') and result.snippet else ""
-                )
-                title = result.title if hasattr(result, 'title') and result.title else "Web Result"
-                url = result.url if hasattr(result, 'url') and result.url else "Web Search"
+                content = getattr(result, 'content', None) or getattr(result, 'snippet', None) or ""
+                title = getattr(result, 'title', None) or "Web Result"
+                url = getattr(result, 'url', None) or "Web Search"
                 
                 # Ensure URL is properly formatted as absolute URL
                 if url and url != "Web Search":
@@ -882,6 +1388,9 @@ class SimpleRAGSystem:
             print(f"✅ DEBUG - Processed {len(results)} usable web results")
             return results
             
+        except asyncio.TimeoutError:
+            print(f"⏱️ Web search timed out after {self.web_search_timeout}s")
+            return []
         except Exception as e:
             print(f"❌ DEBUG - Web search exception: {e}")
             print(f"❌ DEBUG - Exception type: {type(e)}")
@@ -892,9 +1401,9 @@ class SimpleRAGSystem:
     async def _check_ollama_health(self) -> bool:
         """Check if Ollama service is healthy and responsive"""
         try:
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=5)) as session:
-                async with session.get(f"{self.ollama_url}/api/tags") as response:
-                    return response.status == 200
+            session = await self._get_http_session()
+            async with session.get(f"{self.ollama_url}/api/tags", timeout=aiohttp.ClientTimeout(total=5)) as response:
+                return response.status == 200
         except Exception as e:
             print(f"🔍 Ollama health check failed: {e}")
             return False
@@ -903,7 +1412,7 @@ class SimpleRAGSystem:
         """Generate response using Ollama with search results as context"""
         # Health check before making request
         if not await self._check_ollama_health():
-            return "Ollama service is currently unavailable. Please try again in a moment or check if the Ollama service is running."
+            return FallbackResponse("Ollama service is currently unavailable. Please try again in a moment or check if the Ollama service is running.")
         
         max_retries = 2
         for attempt in range(max_retries + 1):
@@ -933,75 +1442,72 @@ Provide a clear, direct answer. Cite sources using [Source X] format when releva
 
                 # Call Ollama API with appropriate timeout
                 timeout = 120 if attempt == 0 else 180  # Increase timeout on retry
-                async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=timeout)) as session:
-                    payload = {
-                        "model": self.ollama_model,
-                        "prompt": prompt,
-                        "stream": False,
-                        "options": {
-                            "temperature": 0.2,  # More decisive, less random
-                            "top_p": 0.8,        # More focused responses
-                            "max_tokens": 1500   # Allow detailed responses
-                        }
+                session = await self._get_http_session()
+                payload = {
+                    "model": self.ollama_model,
+                    "prompt": prompt,
+                    "stream": False,
+                    "keep_alive": self.ollama_keep_alive,
+                    "options": {
+                        "temperature": 0.2,  # More decisive, less random
+                        "top_p": 0.8,        # More focused responses
+                        "max_tokens": 1500   # Allow detailed responses
                     }
-                    
-                    async with session.post(f"{self.ollama_url}/api/generate", json=payload) as response:
-                        if response.status == 200:
-                            result = await response.json()
-                            generated_response = result.get("response", "").strip()
-                            
-                            if generated_response:
-                                return generated_response
-                            else:
-                                print(f"⚠️ Ollama returned empty response on attempt {attempt + 1}")
-                                if attempt < max_retries:
-                                    continue
-                                return "I received your request but couldn't generate a meaningful response. Please try rephrasing your question."
+                }
+                
+                async with session.post(f"{self.ollama_url}/api/generate", json=payload, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                    if response.status == 200:
+                        result = await response.json()
+                        generated_response = result.get("response", "").strip()
+                        
+                        if generated_response:
+                            return generated_response
                         else:
-                            print(f"⚠️ Ollama HTTP error {response.status} on attempt {attempt + 1}")
+                            print(f"⚠️ Ollama returned empty response on attempt {attempt + 1}")
                             if attempt < max_retries:
-                                await asyncio.sleep(2)  # Brief delay before retry
                                 continue
-                            return f"Ollama service error (HTTP {response.status}). Please try again later."
-                
+                            return FallbackResponse("I received your request but couldn't generate a meaningful response. Please try rephrasing your question.")
+                    else:
+                        print(f"⚠️ Ollama HTTP error {response.status} on attempt {attempt + 1}")
+                        if attempt < max_retries:
+                            await asyncio.sleep(2)  # Brief delay before retry
+                            continue
+                        return FallbackResponse(f"Ollama service error (HTTP {response.status}). Please try again later.")
+            
             except asyncio.TimeoutError:
                 print(f"⚠️ Ollama timeout on attempt {attempt + 1}")
                 if attempt < max_retries:
                     await asyncio.sleep(1)
                     continue
-                return "The request timed out while processing. This might be due to a complex query or high server load. Please try a simpler question or wait a moment before trying again."
+                return FallbackResponse("The request timed out while processing. This might be due to a complex query or high server load. Please try a simpler question or wait a moment before trying again.")
             
             except Exception as e:
                 print(f"⚠️ Ollama generation failed on attempt {attempt + 1}: {e}")
                 if attempt < max_retries:
                     await asyncio.sleep(1)
                     continue
-                return f"I found relevant information but couldn't generate a response due to a technical issue: {str(e)}. Please check that Ollama is running and try again."
+                return FallbackResponse(f"I found relevant information but couldn't generate a response due to a technical issue: {str(e)}. Please check that Ollama is running and try again.")
         
         # This shouldn't be reached, but just in case
-        return "Unable to generate response after multiple attempts. Please try again later."
+        return FallbackResponse("Unable to generate response after multiple attempts. Please try again later.")
     
-    async def _generate_openai_response(self, query: str, search_results: List[SearchResult]) -> str:
-        """Generate cost-optimized response using OpenAI with gpt-4o-mini"""
-        if not self.openai_available or not self.openai_client:
-            return "OpenAI service is not available. Please check your API key configuration."
+    def _build_openai_messages(self, query: str, search_results: List[SearchResult]) -> List[Dict[str, str]]:
+        """Build the cost-optimized chat messages sent to OpenAI"""
+        # Prepare context from search results with cost optimization
+        context_parts = []
+        for i, result in enumerate(search_results[:3], 1):  # Limit to 3 sources for cost
+            # Optimize content length for cost efficiency
+            content = result.content[:800] if result.content else ""  # Reduced from 1500
+            context_parts.append(f"[Source {i}] {result.title}\n{content}\n")
         
-        try:
-            # Prepare context from search results with cost optimization
-            context_parts = []
-            for i, result in enumerate(search_results[:3], 1):  # Limit to 3 sources for cost
-                # Optimize content length for cost efficiency
-                content = result.content[:800] if result.content else ""  # Reduced from 1500
-                context_parts.append(f"[Source {i}] {result.title}\n{content}\n")
-            
-            context = "\n".join(context_parts)
-            
-            # Cost-optimized context size (targeting ~2000 input tokens)
-            if len(context) > 4000:  # Reduced from 8000
-                context = context[:4000] + "\n[Context truncated for cost optimization]"
-            
-            # Cost-optimized prompt - concise but effective
-            prompt = f"""Answer the question clearly and concisely based on the provided sources. Be specific and factual.
+        context = "\n".join(context_parts)
+        
+        # Cost-optimized context size (targeting ~2000 input tokens)
+        if len(context) > 4000:  # Reduced from 8000
+            context = context[:4000] + "\n[Context truncated for cost optimization]"
+        
+        # Cost-optimized prompt - concise but effective
+        prompt = f"""Answer the question clearly and concisely based on the provided sources. Be specific and factual.
 
 SOURCES:
 {context}
@@ -1009,14 +1515,22 @@ SOURCES:
 QUESTION: {query}
 
 ANSWER:"""
-            
+        
+        return [
+            {"role": "system", "content": "You are a helpful AI assistant that provides accurate, concise answers based on provided sources. Focus on being informative while staying concise."},
+            {"role": "user", "content": prompt}
+        ]
+    
+    async def _generate_openai_response(self, query: str, search_results: List[SearchResult]) -> str:
+        """Generate cost-optimized response using OpenAI with gpt-4o-mini"""
+        if not self.openai_available or not self.openai_client:
+            return FallbackResponse("OpenAI service is not available. Please check your API key configuration.")
+        
+        try:
             # Call OpenAI API with cost optimization
             response = await self.openai_client.chat.completions.create(
                 model=self.openai_model,  # gpt-4o-mini
-                messages=[
-                    {"role": "system", "content": "You are a helpful AI assistant that provides accurate, concise answers based on provided sources. Focus on being informative while staying concise."},
-                    {"role": "user", "content": prompt}
-                ],
+                messages=self._build_openai_messages(query, search_results),
                 max_tokens=self.max_tokens,  # Cost control (default 150)
                 temperature=0.3,  # More focused responses
                 stream=False
@@ -1030,19 +1544,32 @@ ANSWER:"""
                 estimated_cost = (tokens_used * 0.0000015) if isinstance(tokens_used, int) else 0  # gpt-4o-mini pricing
                 print(f"💰 OpenAI usage: {tokens_used} tokens, ~${estimated_cost:.4f}")
                 
-                return answer if answer else "I couldn't generate a response based on the available information."
+                return answer if answer else FallbackResponse("I couldn't generate a response based on the available information.")
             else:
-                return "I received an empty response from the AI service. Please try again."
+                return FallbackResponse("I received an empty response from the AI service. Please try again.")
                 
         except Exception as e:
             print(f"⚠️ OpenAI generation failed: {e}")
-            return f"I found relevant information but couldn't generate a response due to a technical issue: {str(e)}. Please check your OpenAI API key and try again."
+            return FallbackResponse(f"I found relevant information but couldn't generate a response due to a technical issue: {str(e)}. Please check your OpenAI API key and try again.")
+    
+    async def _stream_openai_response(self, query: str, search_results: List[SearchResult]) -> AsyncIterator[str]:
+        """Stream response text from OpenAI as it is generated"""
+        stream = await self.openai_client.chat.completions.create(
+            model=self.openai_model,  # gpt-4o-mini
+            messages=self._build_openai_messages(query, search_results),
+            max_tokens=self.max_tokens,  # Cost control (default 150)
+            temperature=0.3,  # More focused responses
+            stream=True
+        )
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
     
     async def _generate_qwen_response(self, query: str, search_results: List[SearchResult], mode: str = "with_context") -> str:
         """Generate response using Qwen models with optimized parameters"""
         # Health check before making request
         if not await self._check_ollama_health():
-            return "Qwen AI service is currently unavailable. Please try again in a moment or check if Ollama is running."
+            return FallbackResponse("Qwen AI service is currently unavailable. Please try again in a moment or check if Ollama is running.")
         
         max_retries = 2
         for attempt in range(max_retries + 1):
@@ -1086,56 +1613,57 @@ Answer:"""
 
                 # Qwen-optimized parameters (smaller model, need efficient settings)
                 timeout = 90 if attempt == 0 else 120  # Reasonable timeout for 0.5B model
-                async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=timeout)) as session:
-                    payload = {
-                        "model": self.ollama_model,
-                        "prompt": prompt,
-                        "stream": False,
-                        "options": {
-                            "temperature": 0.3,      # Balanced creativity/accuracy for Qwen
-                            "top_p": 0.9,           # Good diversity for small model
-                            "max_tokens": 1000,     # Reasonable limit for 0.5B
-                            "num_ctx": 8192,        # Context window for Qwen
-                            "repeat_penalty": 1.1,  # Prevent repetition
-                            "top_k": 40             # Vocabulary restriction
-                        }
+                session = await self._get_http_session()
+                payload = {
+                    "model": self.ollama_model,
+                    "prompt": prompt,
+                    "stream": False,
+                    "keep_alive": self.ollama_keep_alive,
+                    "options": {
+                        "temperature": 0.3,      # Balanced creativity/accuracy for Qwen
+                        "top_p": 0.9,           # Good diversity for small model
+                        "max_tokens": 1000,     # Reasonable limit for 0.5B
+                        "num_ctx": 8192,        # Context window for Qwen
+                        "repeat_penalty": 1.1,  # Prevent repetition
+                        "top_k": 40             # Vocabulary restriction
                     }
-                    
-                    async with session.post(f"{self.ollama_url}/api/generate", json=payload) as response:
-                        if response.status == 200:
-                            result = await response.json()
-                            generated_response = result.get("response", "").strip()
-                            
-                            if generated_response:
-                                print(f"✅ Qwen generated response ({len(generated_response)} chars)")
-                                return generated_response
-                            else:
-                                print(f"⚠️ Qwen returned empty response on attempt {attempt + 1}")
-                                if attempt < max_retries:
-                                    continue
-                                return "I received your request but couldn't generate a meaningful response. Please try rephrasing your question."
+                }
+                
+                async with session.post(f"{self.ollama_url}/api/generate", json=payload, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                    if response.status == 200:
+                        result = await response.json()
+                        generated_response = result.get("response", "").strip()
+                        
+                        if generated_response:
+                            print(f"✅ Qwen generated response ({len(generated_response)} chars)")
+                            return generated_response
                         else:
-                            print(f"⚠️ Qwen HTTP error {response.status} on attempt {attempt + 1}")
+                            print(f"⚠️ Qwen returned empty response on attempt {attempt + 1}")
                             if attempt < max_retries:
-                                await asyncio.sleep(2)
                                 continue
-                            return f"Qwen service error (HTTP {response.status}). Please try again later."
-                
+                            return FallbackResponse("I received your request but couldn't generate a meaningful response. Please try rephrasing your question.")
+                    else:
+                        print(f"⚠️ Qwen HTTP error {response.status} on attempt {attempt + 1}")
+                        if attempt < max_retries:
+                            await asyncio.sleep(2)
+                            continue
+                        return FallbackResponse(f"Qwen service error (HTTP {response.status}). Please try again later.")
+            
             except asyncio.TimeoutError:
                 print(f"⚠️ Qwen timeout on attempt {attempt + 1}")
                 if attempt < max_retries:
                     await asyncio.sleep(1)
                     continue
-                return "The request timed out while processing. Please try a simpler question or wait a moment before trying again."
+                return FallbackResponse("The request timed out while processing. Please try a simpler question or wait a moment before trying again.")
             
             except Exception as e:
                 print(f"⚠️ Qwen generation failed on attempt {attempt + 1}: {e}")
                 if attempt < max_retries:
                     await asyncio.sleep(1)
                     continue
-                return f"I found relevant information but couldn't generate a response due to a technical issue: {str(e)}. Please check that Ollama with Qwen is running and try again."
+                return FallbackResponse(f"I found relevant information but couldn't generate a response due to a technical issue: {str(e)}. Please check that Ollama with Qwen is running and try again.")
         
-        return "Unable to generate response after multiple attempts. Please try again later."
+        return FallbackResponse("Unable to generate response after multiple attempts. Please try again later.")
     
     async def _generate_smart_response(self, query: str, search_results: List[SearchResult]) -> str:
         """Smart LLM selection with OpenAI-first approach for cloud deployment"""
@@ -1171,6 +1699,51 @@ Answer:"""
         print("📝 Using simple response generation...")
         return await self._generate_simple_response(query, search_results)
     
+    async def _relay_with_progress(self, items: AsyncIterator[Any], stage: str) -> AsyncIterator[Any]:
+        """Relay items, adding a progress event whenever progress_interval passes without one
+        
+        Qwen and Ollama may stay silent for minutes across their retries; the events let the consumer
+        tell a slow model apart from a stalled search.
+        """
+        next_item = asyncio.ensure_future(anext(items))
+        try:
+            while True:
+                done, _ = await asyncio.wait({next_item}, timeout=self.progress_interval)
+                if not done:
+                    yield {"type": "progress", "stage": stage}
+                    continue
+                try:
+                    item = next_item.result()
+                except StopAsyncIteration:
+                    return
+                yield item
+                next_item = asyncio.ensure_future(anext(items))
+        finally:
+            if not next_item.done():
+                next_item.cancel()
+                await asyncio.gather(next_item, return_exceptions=True)
+            await items.aclose()
+    
+    async def _stream_smart_response(self, query: str, search_results: List[SearchResult]) -> AsyncIterator[str]:
+        """Yield the response in chunks, streaming tokens from OpenAI when it is the primary model"""
+        if self.openai_available and self.openai_client:
+            print("🚀 Streaming from OpenAI (gpt-4o-mini)...")
+            streamed = False
+            try:
+                async for chunk in self._stream_openai_response(query, search_results):
+                    streamed = True
+                    yield chunk
+            except Exception as e:
+                print(f"⚠️ OpenAI streaming failed: {e}")
+                if streamed:
+                    # The answer was cut short: say so, and the marker chunk keeps it out of the caches
+                    yield FallbackResponse("\n\n*(The response was interrupted — please try again.)*")
+            if streamed:
+                return
+        
+        # Qwen and the simple fallback return whole responses, so they arrive as a single chunk
+        yield await self._generate_smart_response(query, search_results)
+    
     async def _generate_simple_response(self, query: str, search_results: List[SearchResult]) -> str:
         """Generate a simple response when both OpenAI and Ollama are unavailable"""
         try:
@@ -1178,29 +1751,25 @@ Answer:"""
             print("🔤 Generating simple response (AI services unavailable)")
             
             if not search_results:
-                return "I couldn't find any relevant information for your query. Please try a different question or check your connection."
+                return FallbackResponse("I couldn't find any relevant information for your query. Please try a different question or check your connection.")
             
-            # Create a simple response by combining search results
-            response_parts = [
-                f"Based on my search, here's what I found about '{query}':\n"
+            # Create a simple response by combining search results in a single join
+            result_blocks = [
+                f"{i}. **{result.title}**\n   {result.content[:300] if result.content else 'No content available'}\n   Source: {result.source}\n"
+                for i, result in enumerate(search_results[:3], 1)
             ]
+            more_line = f"...and {len(search_results) - 3} more results found." if len(search_results) > 3 else None
             
-            for i, result in enumerate(search_results[:3], 1):
-                content = result.content[:300] if result.content else "No content available"
-                response_parts.append(f"{i}. **{result.title}**")
-                response_parts.append(f"   {content}")
-                response_parts.append(f"   Source: {result.source}\n")
-            
-            if len(search_results) > 3:
-                response_parts.append(f"...and {len(search_results) - 3} more results found.")
-            
-            response_parts.append("\n*Note: AI response generation is currently unavailable. This is a compilation of search results.*")
-            
-            return "\n".join(response_parts)
+            return FallbackResponse("\n".join(part for part in (
+                f"Based on my search, here's what I found about '{query}':\n",
+                *result_blocks,
+                more_line,
+                "\n*Note: AI response generation is currently unavailable. This is a compilation of search results.*"
+            ) if part))
             
         except Exception as e:
             print(f"⚠️ Simple response generation failed: {e}")
-            return f"I found some information about '{query}' but couldn't format it properly. Please try again or check the sources directly."
+            return FallbackResponse(f"I found some information about '{query}' but couldn't format it properly. Please try again or check the sources directly.")
     
     def _error_response(self, message: str) -> Dict[str, Any]:
         """Generate error response"""
@@ -1209,7 +1778,8 @@ Answer:"""
             "sources": [],
             "method": "error",
             "processing_time": 0,
-            "query": ""
+            "query": "",
+            "degraded": True
         }
 
 # Test function